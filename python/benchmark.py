@@ -0,0 +1,468 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+"""Simple benchmarks for the jewishdate package.
+
+Run all of them with "python benchmark.py" or pick some by name, e.g.
+"python benchmark.py conversion".
+"""
+from datetime import date, datetime, timedelta
+import os
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+from jewishdate import JewishDate, JewishCalendar, FrozenJewishDate
+from jewishdate.JewishDate import (_get_jcal_elapsed_days, _get_jyear_record, abs_date_to_jdate,
+                                   clear_jyear_cache, datetimeToJewishDate, jdate_to_abs_date)
+
+IMPORT_TIME_BUDGET = 20000 # microseconds "import jewishdate" may take, with compiled bytecode
+FIRST_ORDINAL = date(1, 1, 1).toordinal()
+LAST_ORDINAL = date(9999, 12, 31).toordinal()
+
+
+def report(name, count, seconds):
+    print("%-40s %12.0f per second" % (name, count / seconds))
+
+
+def bench_conversion():
+    """Conversions per second across the Jewish years 3761 - 9999."""
+    dates = [date.fromordinal(o) for o in range(FIRST_ORDINAL, LAST_ORDINAL, 997)]
+    jdates = [datetimeToJewishDate(d) for d in dates]
+
+    def cold():
+        clear_jyear_cache()
+        for d in dates:
+            datetimeToJewishDate(d)
+    seconds = min(timeit.repeat(cold, number=1, repeat=3))
+    report("datetimeToJewishDate (empty year cache)", len(dates), seconds)
+    jyears = range(3761, 10000)
+    seconds = min(timeit.repeat(lambda: [_get_jcal_elapsed_days(y) for y in jyears],
+                                number=1, repeat=3))
+    report("Rosh Hashana by molad calculation", len(jyears), seconds)
+    seconds = min(timeit.repeat(lambda: [_get_jyear_record(y) for y in jyears],
+                                number=1, repeat=3))
+    report("Rosh Hashana from the packed table", len(jyears), seconds)
+    seconds = min(timeit.repeat(lambda: [datetimeToJewishDate(d) for d in dates],
+                                number=1, repeat=3))
+    report("datetimeToJewishDate", len(dates), seconds)
+    seconds = min(timeit.repeat(lambda: [jdate_to_abs_date(*j) for j in jdates],
+                                number=1, repeat=3))
+    report("jdate_to_abs_date", len(jdates), seconds)
+    seconds = min(timeit.repeat(lambda: [JewishDate(d) for d in dates], number=1, repeat=3))
+    report("JewishDate(date)", len(dates), seconds)
+    seconds = min(timeit.repeat(lambda: [JewishDate(d).jday for d in dates], number=1, repeat=3))
+    report("JewishDate(date).jday", len(dates), seconds)
+    seconds = min(timeit.repeat(lambda: [JewishDate(d).dayofweek for d in dates],
+                                number=1, repeat=3))
+    report("JewishDate(date).dayofweek", len(dates), seconds)
+    seconds = min(timeit.repeat(lambda: [JewishDate(*j) for j in jdates], number=1, repeat=3))
+    report("JewishDate(jyear, jmonth, jday)", len(jdates), seconds)
+
+
+def bench_vectorized():
+    """Array conversions per second, compared to JewishDate per row."""
+    import numpy
+    from jewishdate.vectorized import ordinals_to_jdates, jdates_to_ordinals
+    ordinals = numpy.arange(FIRST_ORDINAL, LAST_ORDINAL)
+    jyears, jmonths, jdays = ordinals_to_jdates(ordinals)
+    seconds = min(timeit.repeat(lambda: ordinals_to_jdates(ordinals), number=1, repeat=3))
+    report("ordinals_to_jdates", len(ordinals), seconds)
+    seconds = min(timeit.repeat(lambda: jdates_to_ordinals(jyears, jmonths, jdays),
+                                number=1, repeat=3))
+    report("jdates_to_ordinals", len(ordinals), seconds)
+    dates = [date.fromordinal(o) for o in range(FIRST_ORDINAL, LAST_ORDINAL, 97)]
+    seconds = min(timeit.repeat(lambda: [JewishDate(d) for d in dates], number=1, repeat=3))
+    report("JewishDate(date) per row", len(dates), seconds)
+
+
+def bench_yahrzeit():
+    """Yahrzeits per second for records of deaths over 200 years."""
+    import numpy
+    from jewishdate.JewishDate import get_yahrzeit
+    from jewishdate.vectorized import ordinals_to_jdates, jdates_to_yahrzeits
+    ordinals = numpy.arange(date(1820, 1, 1).toordinal(), date(2020, 1, 1).toordinal())
+    ordinals = numpy.tile(ordinals, 14)[:1000000]
+    jyears, jmonths, jdays = ordinals_to_jdates(ordinals)
+    jdates = list(zip(jyears.tolist(), jmonths.tolist(), jdays.tolist()))[::100]
+    def per_record():
+        for jyear, jmonth, jday in jdates:
+            try:
+                JewishDate(jyear, jmonth, jday).jreplace(jyear=5785)
+            except ValueError:
+                pass
+    seconds = min(timeit.repeat(per_record, number=1, repeat=3))
+    report("JewishDate.jreplace per record", len(jdates), seconds)
+    seconds = min(timeit.repeat(lambda: [get_yahrzeit(y, m, d, 5785) for y, m, d in jdates],
+                                number=1, repeat=3))
+    report("get_yahrzeit", len(jdates), seconds)
+    seconds = min(timeit.repeat(lambda: jdates_to_yahrzeits(jyears, jmonths, jdays, 5785),
+                                number=1, repeat=3))
+    report("jdates_to_yahrzeits", len(ordinals), seconds)
+
+
+def bench_memory():
+    """Bytes per instance of the date classes, measured with tracemalloc."""
+    def jewish_date_with_fields(ordinal):
+        jewishdate = JewishDate(datetime.fromordinal(ordinal))
+        jewishdate.jday
+        return jewishdate
+    ordinals = range(FIRST_ORDINAL, LAST_ORDINAL, 97)
+    for ordinal in ordinals: # fill the year cache so it isn't counted
+        abs_date_to_jdate(ordinal)
+    for name, create in (("JewishDate(datetime)", lambda o: JewishDate(datetime.fromordinal(o))),
+                         ("JewishDate(datetime) after .jday", jewish_date_with_fields),
+                         ("JewishCalendar(datetime)",
+                          lambda o: JewishCalendar(datetime.fromordinal(o))),
+                         ("FrozenJewishDate", FrozenJewishDate.fromordinal)):
+        tracemalloc.start()
+        instances = [create(o) for o in ordinals]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print("%-40s %12.0f bytes per instance" % (name, float(size) / len(instances)))
+
+
+def bench_range():
+    """Days per second when scanning a year for holidays."""
+    start = JewishDate(5778, 7, 1).toordinal()
+    days = list(range(start, start + 355 * 10))
+    def fresh():
+        for ordinal in days:
+            JewishCalendar(datetime.fromordinal(ordinal)).get_yom_tov_index()
+    def scan(cursor):
+        for calendar in JewishCalendar.range(date.fromordinal(days[0]),
+                                             date.fromordinal(days[-1] + 1), cursor=cursor):
+            calendar.get_yom_tov_index()
+    seconds = min(timeit.repeat(fresh, number=1, repeat=3))
+    report("JewishCalendar per day", len(days), seconds)
+    seconds = min(timeit.repeat(lambda: scan(False), number=1, repeat=3))
+    report("JewishCalendar.range", len(days), seconds)
+    seconds = min(timeit.repeat(lambda: scan(True), number=1, repeat=3))
+    report("JewishCalendar.range(cursor=True)", len(days), seconds)
+
+
+def bench_parsha():
+    """Shabbosim per second when listing the parshiyos of 100 years."""
+    from jewishdate.JewishDate import get_parshiyos
+    start = date(2000, 1, 1).toordinal()
+    stop = date(2100, 1, 1).toordinal()
+    shabbosim = [o for o in range(start, stop) if o % 7 == 6]
+    seconds = min(timeit.repeat(
+        lambda: [JewishCalendar(datetime.fromordinal(o)).get_parsha_index() for o in shabbosim],
+        number=1, repeat=3))
+    report("JewishCalendar.get_parsha_index", len(shabbosim), seconds)
+    seconds = min(timeit.repeat(lambda: get_parshiyos(start, stop), number=1, repeat=3))
+    report("get_parshiyos", len(shabbosim), seconds)
+
+
+def bench_daf():
+    """Days per second when listing the Daf Yomi of 100 years."""
+    from jewishdate.JewishDate import get_daf_yomi_bavli, get_daf_yomi_bavli_range
+    start = date(1950, 1, 1).toordinal()
+    stop = date(2050, 1, 1).toordinal()
+    calendars = [JewishCalendar(datetime.fromordinal(o)) for o in range(start, stop)]
+    seconds = min(timeit.repeat(lambda: [c.get_daf_yomi_bavli() for c in calendars],
+                                number=1, repeat=3))
+    report("JewishCalendar.get_daf_yomi_bavli", len(calendars), seconds)
+    seconds = min(timeit.repeat(lambda: [get_daf_yomi_bavli(o) for o in range(start, stop)],
+                                number=1, repeat=3))
+    report("get_daf_yomi_bavli", len(calendars), seconds)
+    seconds = min(timeit.repeat(lambda: list(get_daf_yomi_bavli_range(start, stop)),
+                                number=1, repeat=3))
+    report("get_daf_yomi_bavli_range", len(calendars), seconds)
+
+
+def bench_molad():
+    """Molados per second for every month of 100 years."""
+    from jewishdate.JewishDate import add_jmonths, get_jyear_molados
+    months = []
+    year, month = 5750, 7
+    while year < 5850:
+        months.append((year, month))
+        year, month = add_jmonths(year, month, 1)
+    seconds = min(timeit.repeat(lambda: [JewishDate(y, m, 1).get_molad() for y, m in months],
+                                number=1, repeat=3))
+    report("JewishDate.get_molad", len(months), seconds)
+    seconds = min(timeit.repeat(lambda: get_jyear_molados(5750, 5850), number=1, repeat=3))
+    report("get_jyear_molados", len(months), seconds)
+
+
+def bench_kiddush_levana():
+    """Kiddush Levana times per second for 10 years and 20 locations in 4 time zones."""
+    from datetime import timedelta
+    from pytz import timezone, utc
+    from jewishdate.JewishDate import get_jyear_molados
+    from jewishdate.kiddush_levana import get_kiddush_levana_times, JERUSALEM_MEAN_TIME_OFFSET
+    from jewishdate.utils import GeoLocation
+    zones = [timezone(name) for name in ("America/New_York", "Europe/London", "Asia/Jerusalem",
+                                         "Australia/Melbourne")]
+    locations = [GeoLocation("Location %s" % i, 0, 0, 0, zones[i % len(zones)])
+                 for i in range(20)]
+    molados = get_jyear_molados(5780, 5790)
+    months = list(zip(molados.years, molados.months))
+    offsets = [timedelta(days=3), timedelta(days=7), timedelta(days=14, hours=18, minutes=22,
+                                                                seconds=1, microseconds=666667),
+               timedelta(days=15)]
+    def per_item():
+        for location in locations:
+            for year, month in months:
+                molad = JewishDate(year, month, 1).get_molad().dt
+                molad = utc.localize(molad - JERUSALEM_MEAN_TIME_OFFSET)
+                [(molad + offset).astimezone(location.timeZone) for offset in offsets]
+    count = len(months) * len(locations)
+    seconds = min(timeit.repeat(per_item, number=1, repeat=3))
+    report("per month and location", count, seconds)
+    seconds = min(timeit.repeat(lambda: get_kiddush_levana_times(molados, locations),
+                                number=1, repeat=3))
+    report("get_kiddush_levana_times", count, seconds)
+
+
+def bench_recurrence():
+    """Next Shabbos Mevarchim queries per second, stepping with forward() or using the rule."""
+    from jewishdate.recurrence import ShabbosMevarchimRule
+    ordinals = list(range(date(2000, 1, 1).toordinal(), date(2100, 1, 1).toordinal(), 97))
+    def forward(ordinal):
+        calendar = JewishCalendar(datetime.fromordinal(ordinal))
+        calendar.forward()
+        while not (calendar.dayofweek == 7 and 23 <= calendar.jday <= 29
+                   and calendar.jmonth != calendar.ELUL):
+            calendar.forward()
+        return calendar.toordinal()
+    rule = ShabbosMevarchimRule()
+    seconds = min(timeit.repeat(lambda: [forward(o) for o in ordinals], number=1, repeat=3))
+    report("JewishCalendar.forward() loop", len(ordinals), seconds)
+    seconds = min(timeit.repeat(lambda: [rule.next_after(o) for o in ordinals],
+                                number=1, repeat=3))
+    report("ShabbosMevarchimRule.next_after", len(ordinals), seconds)
+
+
+def bench_anniversary_index():
+    """Days per second when finding the anniversaries of 100,000 records for a year."""
+    import random
+    from jewishdate.JewishDate import get_anniversary
+    from jewishdate.recurrence import AnniversaryIndex
+    random.seed(0)
+    jdates = [abs_date_to_jdate(random.randrange(date(1900, 1, 1).toordinal(),
+                                                 date(2020, 1, 1).toordinal()))
+              for _ in range(100000)]
+    index = AnniversaryIndex()
+    for number, jdate in enumerate(jdates):
+        index.add(*(jdate + (number,)))
+    start = date(2025, 1, 1).toordinal()
+    def every_record(ordinal):
+        jyear = abs_date_to_jdate(ordinal)[0]
+        return [number for number, jdate in enumerate(jdates)
+                if get_anniversary(*(jdate + (jyear,))) == ordinal]
+    seconds = min(timeit.repeat(lambda: every_record(start), number=1, repeat=3))
+    report("every record per day", 1, seconds)
+    days = range(start, start + 365)
+    seconds = min(timeit.repeat(lambda: [index.events_on(o) for o in days], number=1, repeat=3))
+    report("AnniversaryIndex.events_on", len(days), seconds)
+
+
+def bench_day_info():
+    """Days per second when collecting the calendar information of 10 years."""
+    from jewishdate.JewishDate import get_day_info
+    start = date(2020, 1, 1).toordinal()
+    stop = date(2030, 1, 1).toordinal()
+    def per_day():
+        for ordinal in range(start, stop):
+            calendar = JewishCalendar(datetime.fromordinal(ordinal))
+            (calendar.jyear, calendar.jmonth, calendar.jday, calendar.dayofweek,
+             calendar.get_yom_tov_index(), calendar.is_yom_tov(), calendar.is_chol_hamoed(),
+             calendar.is_erev_yom_tov(), calendar.is_taanis(), calendar.is_rosh_chodesh(),
+             calendar.get_day_of_chanukah(), calendar.get_day_of_omer(),
+             calendar.get_parsha_index(), calendar.get_daf_yomi_bavli())
+    seconds = min(timeit.repeat(per_day, number=1, repeat=3))
+    report("JewishCalendar per day", stop - start, seconds)
+    seconds = min(timeit.repeat(lambda: get_day_info(start, stop), number=1, repeat=3))
+    report("get_day_info", stop - start, seconds)
+
+
+def bench_str():
+    """Time and transient allocations per str(jdate), with a new formatter per call (as
+    before the shared formatters) and with the shared formatter str uses.
+    """
+    from jewishdate import HebrewDateFormatter
+    jdates = [JewishDate(date(2020, 1, 1) + timedelta(days=i)) for i in range(1000)]
+    for jdate in jdates: # fill the Jewish date fields so they aren't counted
+        jdate.jday
+    for name, render in (("new formatter per date", lambda d: HebrewDateFormatter().format_date(d)),
+                         ("str(jdate)", str),
+                         ("jdate.heb_string", lambda d: d.heb_string)):
+        seconds = min(timeit.repeat(lambda: [render(d) for d in jdates], number=1, repeat=5))
+        report(name, len(jdates), seconds)
+        tracemalloc.start()
+        peak = 0
+        for jdate in jdates[:100]:
+            tracemalloc.reset_peak()
+            render(jdate)
+            peak += tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print("%-40s %12.0f bytes allocated per call" % (name, peak / 100.0))
+
+
+TEMPLATE_FORMATS = ["#e #b #y", "#D #B, #Y", "#a #e #b", "#A, #D #B #Y", "#d/#m/#Y", "#Y-#m-#d",
+                    "%A %d %B %Y - #e #b #y", "#e #b", "#D #B", "#y", "%H:%M #a", "##e #e"]
+
+def bench_format():
+    """Format calls per second with a dozen format strings, with the compiled programs cached
+    and compiling every call.
+    """
+    from jewishdate import HebrewDateFormatter
+    from jewishdate.HebrewDateFormatter import _format_programs
+    formatter = HebrewDateFormatter.get_shared(hebrew=True)
+    jdates = [JewishDate(date(2020, 1, 1) + timedelta(days=i)) for i in range(100)]
+    calls = [(d, f) for d in jdates for f in TEMPLATE_FORMATS]
+    seconds = min(timeit.repeat(lambda: [formatter.format(d, f) for d, f in calls],
+                                number=1, repeat=5))
+    report("format (cached programs)", len(calls), seconds)
+    def compiling():
+        for d, f in calls:
+            _format_programs.clear()
+            formatter.format(d, f)
+    seconds = min(timeit.repeat(compiling, number=1, repeat=5))
+    report("format (compiling every call)", len(calls), seconds)
+
+
+def bench_hebrew_number():
+    """formatHebrewNumber calls per second for every day and year number, building the strings
+    and from the filled tables.
+    """
+    from jewishdate import HebrewDateFormatter
+    from jewishdate.HebrewDateFormatter import _hebrew_numbers
+    formatter = HebrewDateFormatter.get_shared(hebrew=True)
+    numbers = list(range(1, 31)) + list(range(5700, 5900))
+    def build():
+        _hebrew_numbers.clear()
+        for number in numbers:
+            formatter.formatHebrewNumber(number)
+    seconds = min(timeit.repeat(build, number=1, repeat=5))
+    report("formatHebrewNumber (building)", len(numbers), seconds)
+    seconds = min(timeit.repeat(lambda: [formatter.formatHebrewNumber(n) for n in numbers],
+                                number=1, repeat=5))
+    report("formatHebrewNumber (table)", len(numbers), seconds)
+
+
+def bench_render():
+    """Format calls per second for Hebrew only, mixed and strftime heavy format strings,
+    rendered natively and with a strftime pass over every result.
+    """
+    from jewishdate import HebrewDateFormatter
+    formatter = HebrewDateFormatter.get_shared(hebrew=True)
+    jdates = [JewishDate(datetime(2020, 1, 1, 12, 30) + timedelta(days=i)) for i in range(1000)]
+    def with_strftime(jdate, format_string):
+        leading, steps = formatter.compile_format(format_string)
+        result = [leading]
+        for method, following in steps:
+            result.append(method(formatter, jdate))
+            result.append(following)
+        return jdate.dt.strftime(''.join(result))
+    for name, format_string in (("Hebrew only", "#a #e #b #y"),
+                                ("mixed", "%d/%m/%Y %H:%M - #e #b #y"),
+                                ("strftime heavy", "%A %d %B %Y %I:%M %p (#e #b)")):
+        seconds = min(timeit.repeat(lambda: [formatter.format(d, format_string) for d in jdates],
+                                    number=1, repeat=5))
+        report("format, %s" % name, len(jdates), seconds)
+        seconds = min(timeit.repeat(lambda: [with_strftime(d, format_string) for d in jdates],
+                                    number=1, repeat=5))
+        report("format with strftime pass, %s" % name, len(jdates), seconds)
+
+
+def bench_format_many():
+    """Dates per second formatting a year of dates for a printable luach, one date at a time
+    and with format_many / write_many.
+    """
+    import io
+    from jewishdate import HebrewDateFormatter
+    formatter = HebrewDateFormatter.get_shared(hebrew=True)
+    jdates = [JewishDate(date(2020, 9, 19) + timedelta(days=i)) for i in range(385)]
+    for format_string in ("#a #e #b #y", "%d/%m/%Y #e #b #y", None):
+        name = format_string or "format_date"
+        if format_string is None:
+            one_at_a_time = lambda: [formatter.format_date(d) for d in jdates]
+        else:
+            one_at_a_time = lambda: [formatter.format(d, format_string) for d in jdates]
+        seconds = min(timeit.repeat(one_at_a_time, number=1, repeat=5))
+        report("%s, one at a time" % name, len(jdates), seconds)
+        seconds = min(timeit.repeat(lambda: formatter.format_many(jdates, format_string),
+                                    number=1, repeat=5))
+        report("%s, format_many" % name, len(jdates), seconds)
+        seconds = min(timeit.repeat(lambda: formatter.write_many(io.StringIO(), jdates,
+                                                                 format_string),
+                                    number=1, repeat=5))
+        report("%s, write_many" % name, len(jdates), seconds)
+
+
+def bench_parse():
+    """Dates per second parsing CSV-like rows of Hebrew and transliterated dates, one at a time
+    with parse_jdate and in bulk with parse_jdates, which parses every distinct row once.
+    """
+    from jewishdate import HebrewDateFormatter
+    from jewishdate.parser import parse_jdate, parse_jdates
+    jdates = [JewishDate(date(1950, 1, 1) + timedelta(days=i)) for i in range(0, 36500, 73)]
+    texts = [formatter.format_date(jdate) for jdate in jdates
+             for formatter in (HebrewDateFormatter(), HebrewDateFormatter(hebrew=True))]
+    rows = texts * 20
+    parse_jdate(texts[0]) # builds the reverse maps
+    seconds = min(timeit.repeat(lambda: [parse_jdate(text) for text in rows], number=1,
+                                repeat=5))
+    report("parse_jdate", len(rows), seconds)
+    seconds = min(timeit.repeat(lambda: parse_jdates(rows), number=1, repeat=5))
+    report("parse_jdates", len(rows), seconds)
+
+
+def get_import_time():
+    """Returns the time of "import jewishdate" in a new interpreter in microseconds, from
+    -X importtime. The first run writes the bytecode, the best of the others is returned.
+    """
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    times = []
+    for _ in range(6):
+        output = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import jewishdate'],
+                                env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                                stderr=subprocess.PIPE, universal_newlines=True,
+                                check=True).stderr
+        for line in output.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == 'jewishdate':
+                times.append(int(fields[1]))
+    return min(times[1:])
+
+
+def bench_startup():
+    """Time of "import jewishdate" (see get_import_time), failing the benchmark if it is over
+    IMPORT_TIME_BUDGET. test.py checks the budget as well.
+    """
+    best = get_import_time()
+    print("%-40s %12d microseconds (budget %d)" % ("import jewishdate", best, IMPORT_TIME_BUDGET))
+    assert best <= IMPORT_TIME_BUDGET, "import jewishdate is over IMPORT_TIME_BUDGET"
+
+
+BENCHMARKS = {
+    'anniversary_index': bench_anniversary_index,
+    'conversion': bench_conversion,
+    'daf': bench_daf,
+    'day_info': bench_day_info,
+    'format': bench_format,
+    'format_many': bench_format_many,
+    'hebrew_number': bench_hebrew_number,
+    'kiddush_levana': bench_kiddush_levana,
+    'memory': bench_memory,
+    'molad': bench_molad,
+    'parse': bench_parse,
+    'parsha': bench_parsha,
+    'range': bench_range,
+    'startup': bench_startup,
+    'str': bench_str,
+    'recurrence': bench_recurrence,
+    'render': bench_render,
+    'vectorized': bench_vectorized,
+    'yahrzeit': bench_yahrzeit,
+}
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or sorted(BENCHMARKS):
+        print("== %s" % name)
+        BENCHMARKS[name]()
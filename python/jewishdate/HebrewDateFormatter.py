@@ -18,18 +18,115 @@
  * http://www.gnu.org/licenses/old-licenses/lgpl-2.1.html
  """
 
-from .JewishDate import JewishDate, JewishCalendar
+from collections import namedtuple, OrderedDict
+from datetime import datetime
+from operator import attrgetter
+
+from .JewishDate import JewishDate, JewishCalendar, FrozenJewishDate
 FORMAT_DELIMITER = '#'
+FORMAT_CACHE_SIZE = 256 # compiled format strings kept by HebrewDateFormatter.format
+# (class, format string) -> (program, native program), see compile_format
+_format_programs = OrderedDict()
+# (class, use_gersh_gershayim, use_long_hebrew_years) -> {number: string}, see formatHebrewNumber
+_hebrew_numbers = {}
+_shared_formatters = {} # (class, FormatterConfig) -> formatter
+_directives = {} # (class, name) -> directive, see HebrewDateFormatter._get_directive
+# the built-in directives and methods format calls with the config to render with. Methods a
+# subclass or an instance overrides are called with the date (or number) only.
+CONFIG_METHODS = frozenset('aAbBcdDeEmMyY') | {'format_date', 'format_month',
+                                               'formatHebrewNumber'}
+
+FormatterConfig = namedtuple('FormatterConfig', 'hebrew use_gersh_gershayim use_long_hebrew_years '
+                             'long_week_format')
+FormatterConfig.__doc__ = """The settings of a HebrewDateFormatter. A formatter's settings are
+replaced together, so a date is always rendered with one configuration even if another thread
+changes the formatter.
+
+hebrew -- format in Hebrew instead of transliterated Latin chars
+use_gersh_gershayim -- add a geresh or gershayim to Hebrew numbers
+use_long_hebrew_years -- include the thousands in Hebrew years, e.g. ה׳ תשע״ז
+long_week_format -- use the Hebrew day name instead of its number
+"""
+DEFAULT_CONFIG = FormatterConfig(hebrew=False, use_gersh_gershayim=True,
+                                 use_long_hebrew_years=False, long_week_format=True)
+
+def _config_property(name):
+    """Returns a property of a FormatterConfig field, setting it replaces the config"""
+    def get(self):
+        return getattr(self.config, name)
+    def set(self, value):
+        self.config = self.config._replace(**{name: value})
+    return property(get, set, doc="The %s setting of the FormatterConfig" % name)
+# strftime directives format renders itself: the datetime attribute and its printf format.
+# Format strings with other directives get a strftime pass over the whole result, as strftime
+# can fail on one and return an empty string.
+STRFTIME_DIRECTIVES = {'d': ('day', '%02d'), 'm': ('month', '%02d'), 'Y': ('year', '%d'),
+                       'H': ('hour', '%02d'), 'M': ('minute', '%02d'), 'S': ('second', '%02d')}
+
+def _compile_strftime(text):
+    """Returns the text (from a program of compile_format) as a list of parts like
+    compile_format's: the text if it has no strftime directives, or a directive rendering them
+    between empty texts. Returns None if it has other strftime directives or ends in a "%"
+    strftime would combine with the text following it.
+    """
+    template = []
+    attributes = []
+    index = 0
+    while True:
+        percent = text.find('%', index)
+        if percent < 0:
+            template.append(text[index:])
+            break
+        template.append(text[index:percent])
+        directive = text[percent + 1:percent + 2]
+        if not directive:
+            return None
+        if directive == '%':
+            template.append('%%')
+        elif directive in STRFTIME_DIRECTIVES:
+            attribute, printf_format = STRFTIME_DIRECTIVES[directive]
+            attributes.append(attribute)
+            template.append(printf_format)
+        else:
+            return None
+        index = percent + 2
+    template = ''.join(template)
+    if not attributes:
+        return [template % ()]
+    get_values = attrgetter(*attributes)
+    def render(self, jewishdate, config=None):
+        dt = jewishdate.dt
+        # strftime pads years before 1000 differently by platform, and a date has no time
+        if dt.year < 1000 or not isinstance(dt, datetime):
+            return dt.strftime(text)
+        return template % get_values(dt)
+    return ['', render, '']
+
+def _without_config(name):
+    """Returns a directive calling the formatter's method name with the date only, for methods
+    that don't take a config
+    """
+    def render(self, jewishdate, config=None):
+        return getattr(self, name)(jewishdate)
+    return render
+
 class HebrewDateFormatter(object):
     """The HebrewDateFormatter class formats a JewishDate.
     The class formats Jewish dates in Hebrew or Latin chars, and has various settings.
+    The settings are kept in an immutable FormatterConfig that every method reads once and
+    passes on, so one formatter can be used by many threads. HebrewDateFormatter.get_shared
+    returns a read only formatter per configuration that can be reused instead of creating a new
+    formatter for every date.
     Author: Eliyahu Hershfeld 2011
     Version: 0.3
     """
-    hebrew = False
-    use_long_hebrew_years = False
-    use_gersh_gershayim = True
-    long_week_format = True
+    _frozen = False
+    _own_directives = False # an instance attribute overrides a directive, see __setattr__
+    config = DEFAULT_CONFIG
+    hebrew = _config_property('hebrew')
+    use_long_hebrew_years = _config_property('use_long_hebrew_years')
+    use_gersh_gershayim = _config_property('use_gersh_gershayim')
+    long_week_format = _config_property('long_week_format')
 
     GERESH = "׳"
     GERSHAYIM = "״"
@@ -128,9 +225,40 @@ class HebrewDateFormatter(object):
 
 
 
-    def format(self, jewishdate, format_string):
+    @classmethod
+    def compile_format(cls, format_string):
+        """Returns the format string compiled to a tuple of the leading text and a tuple of
+        (directive method, following text) pairs. The last FORMAT_CACHE_SIZE format strings
+        used are kept compiled.
+        """
+        return cls._get_format_programs(format_string)[0]
+
+    @classmethod
+    def _get_format_programs(cls, format_string):
+        """Returns the compile_format program and the native program, the same with the
+        strftime directives rendered by format (see STRFTIME_DIRECTIVES), or None when the text
+        needs strftime
+        """
+        key = (cls, format_string)
+        try:
+            programs = _format_programs[key]
+            _format_programs.move_to_end(key)
+            return programs
+        except KeyError:
+            pass
+        programs = cls._compile_format_programs(format_string)
+        if len(_format_programs) >= FORMAT_CACHE_SIZE:
+            _format_programs.popitem(last=False)
+        _format_programs[key] = programs
+        return programs
+
+    @classmethod
+    def _compile_format_programs(cls, format_string, formatter=None):
+        """Compiles the programs of _get_format_programs, with the directives the formatter
+        overrides when there is one
+        """
+        parts = [''] # text, then a directive method and the text following it for every directive
         format_array = format_string.split(FORMAT_DELIMITER)
-        result = []
         index = 0
         already_dbl_hash = False
         for i, piece in enumerate(format_array):
@@ -138,41 +266,221 @@ class HebrewDateFormatter(object):
                 index += 1
             else:
                 if not piece and (index == 1):
-                    result.append(FORMAT_DELIMITER)
+                    parts[-1] += FORMAT_DELIMITER
                     already_dbl_hash = True
                 elif i > 0:
-                    # should a non format letter with a # in front return z or empty string? strftime does %z
-                    result.append(getattr(self, piece[0], lambda x: ("" if already_dbl_hash else "#")+piece[0])(jewishdate)+piece[1:])
+                    if formatter is not None and piece[0] in formatter.__dict__:
+                        method = _without_config(piece[0])
+                    else:
+                        method = cls._get_directive(piece[0])
+                    if method is None:
+                        # should a non format letter with a # in front return z or empty string? strftime does %z
+                        parts[-1] += ("" if already_dbl_hash else "#") + piece[0]
+                    else:
+                        parts.extend((method, ''))
+                    parts[-1] += piece[1:]
                     already_dbl_hash = False
                 else:#
-                    result.append(piece)
+                    parts[-1] += piece
                     already_dbl_hash = False
                 index = 0
+        program = (parts[0], tuple(zip(parts[1::2], parts[2::2])))
+        native = [_compile_strftime(part) if i % 2 == 0 else [part]
+                  for i, part in enumerate(parts)]
+        if None in native:
+            native = None
+        else:
+            # every split starts and ends with text, so the parts still alternate
+            parts = [part for split in native for part in split]
+            native = (parts[0], tuple(zip(parts[1::2], parts[2::2])))
+        return (program, native)
+
+    @classmethod
+    def _get_directive(cls, name):
+        """Returns the method name of the class as a function called with the formatter, the
+        date and the config, or None if there is no such method. Only the built-in methods in
+        CONFIG_METHODS take the config, others read the formatter's settings.
+        """
+        key = (cls, name)
+        try:
+            return _directives[key]
+        except KeyError:
+            pass
+        method = getattr(cls, name, None)
+        if method is not None and (name not in CONFIG_METHODS
+                                   or method is not getattr(HebrewDateFormatter, name)):
+            method = _without_config(name)
+        _directives[key] = method
+        return method
+
+    def _render(self, name, jewishdate, config):
+        """Returns the method name's string of the date with the config, see _get_directive"""
+        if self._own_directives and name in self.__dict__:
+            return self.__dict__[name](jewishdate)
+        try:
+            directive = _directives[type(self), name]
+        except KeyError:
+            directive = self._get_directive(name)
+        return directive(self, jewishdate, config)
+
+    def format(self, jewishdate, format_string):
+        config = self.config
+        if self._own_directives:
+            program, native = self._compile_format_programs(format_string, self)
+        else:
+            program, native = self._get_format_programs(format_string)
+        if native is not None:
+            leading, steps = native
+            result = [leading]
+            for method, following in steps:
+                value = method(self, jewishdate, config)
+                if '%' in value: # strftime would read it as a directive
+                    break
+                result.append(value)
+                result.append(following)
+            else:
+                return ''.join(result)
+        leading, steps = program
+        result = [leading]
+        for method, following in steps:
+            result.append(method(self, jewishdate, config))
+            result.append(following)
         return jewishdate.dt.strftime(''.join(result))
 
+    def format_many(self, dates, format_string=None):
+        """Returns a list of the dates formatted with format, or with format_date when there is
+        no format_string. The dates can be JewishDate, FrozenJewishDate, date or datetime
+        objects. Directives that give the same string for a whole year, month or weekday (the
+        month names, year numbers, day names) are only rendered once for the dates, so long
+        runs of dates are formatted faster than one at a time.
+        """
+        return list(self._format_many(dates, format_string))
 
-    def formatYomTov(self, jewishCalendar):
+    def write_many(self, file, dates, format_string=None, line_end="\n"):
+        """Writes the dates formatted like format_many to a file-like object, each followed by
+        line_end, without building a list of all of them
+        """
+        for text in self._format_many(dates, format_string):
+            file.write(text)
+            file.write(line_end)
+
+    def _format_many(self, dates, format_string):
+        """Generates the strings of format_many, reusing the results of the directives in
+        _RUN_KEYS by their key. Directives using a method the class or the formatter overrides
+        are rendered for every date.
+        """
+        config = self.config
+        overridden = set(name for name in CONFIG_METHODS
+                         if self._get_directive(name) is not getattr(HebrewDateFormatter, name)
+                         or self._own_directives and name in self.__dict__)
+        program = None
+        if format_string is None:
+            if 'format_date' in overridden: # it can't be split
+                native = ('', ((_without_config('format_date'), ''),))
+            else:
+                native = ('', ((HebrewDateFormatter._format_day_of_date, ''),
+                               (HebrewDateFormatter._format_month_and_year, '')))
+        elif self._own_directives:
+            program, native = self._compile_format_programs(format_string, self)
+        else:
+            program, native = self._get_format_programs(format_string)
+        leading, steps = native if native is not None else program
+        run_steps = []
+        for method, following in steps:
+            get_key, uses = _RUN_KEYS.get(method, (None, ()))
+            if overridden.intersection(uses):
+                get_key = None
+            run_steps.append((method, following, get_key, {}))
+        for jewishdate in dates:
+            if not isinstance(jewishdate, JewishDate):
+                if isinstance(jewishdate, FrozenJewishDate):
+                    jewishdate = jewishdate.to_jewish_date()
+                else:
+                    jewishdate = JewishDate(jewishdate)
+            result = [leading]
+            for method, following, get_key, values in run_steps:
+                if get_key is None:
+                    value = method(self, jewishdate, config)
+                else:
+                    key = get_key(jewishdate)
+                    value = values.get(key)
+                    if value is None:
+                        value = values[key] = method(self, jewishdate, config)
+                result.append(value)
+                result.append(following)
+            result = ''.join(result)
+            if native is None:
+                yield jewishdate.dt.strftime(result)
+            elif '%' in result and format_string is not None:
+                # a directive returned a "%" (or the format has a "%%"), format handles it
+                yield self.format(jewishdate, format_string)
+            else:
+                yield result
+
+
+    def formatYomTov(self, jewishCalendar, config=None):
         """Formats the Yom Tov (holiday) in Hebrew or transliterated Latin characters."""
+        if config is None:
+            config = self.config
         index = jewishCalendar.get_yom_tov_index()
         if index == JewishCalendar.CHANUKAH:
             dayOfChanukah = jewishCalendar.getDayOfChanukah()
-            if self.hebrew:
-                return (self.formatHebrewNumber(dayOfChanukah) + " " + self.hebrew_holidays[index])
+            if config.hebrew:
+                return (self._format_number(dayOfChanukah, config) + " "
+                        + self.hebrew_holidays[index])
             else:
                 return (self.transliterated_holidays[index] + " " +  str(dayOfChanukah))
         if not index:
             return ""
         else:
-            if self.hebrew:
+            if config.hebrew:
                 return self.hebrew_holidays[index]
             else:
                 return self.transliterated_holidays[index]
 
-    def __init__(self, hebrew=False):
-        self.hebrew = hebrew
-
-    def formatRoshChodesh(self, jewishCalendar):
+    def __init__(self, hebrew=False, use_gersh_gershayim=None, use_long_hebrew_years=None,
+                 config=None):
+        """Creates a formatter with the config, or DEFAULT_CONFIG with the settings given"""
+        if config is None:
+            config = DEFAULT_CONFIG._replace(hebrew=hebrew)
+            if use_gersh_gershayim is not None:
+                config = config._replace(use_gersh_gershayim=use_gersh_gershayim)
+            if use_long_hebrew_years is not None:
+                config = config._replace(use_long_hebrew_years=use_long_hebrew_years)
+        self.config = config
+
+    def __setattr__(self, name, value):
+        if self._frozen:
+            raise AttributeError("Shared formatters can't be changed, create a %s instead"
+                                 % type(self).__name__)
+        if len(name) == 1 or name in CONFIG_METHODS:
+            # compiled format programs don't have the instance's directive
+            object.__setattr__(self, '_own_directives', True)
+        object.__setattr__(self, name, value)
+
+    @classmethod
+    def get_shared(cls, hebrew=False, use_gersh_gershayim=True, use_long_hebrew_years=False,
+                   config=None):
+        """Returns the read only formatter of the configuration (config, or the settings
+        given), created on the first call. Setting an attribute of it raises an AttributeError.
+        """
+        if config is None:
+            config = DEFAULT_CONFIG._replace(hebrew=hebrew,
+                                             use_gersh_gershayim=use_gersh_gershayim,
+                                             use_long_hebrew_years=use_long_hebrew_years)
+        key = (cls, config)
+        formatter = _shared_formatters.get(key)
+        if formatter is None:
+            formatter = cls(config=config)
+            object.__setattr__(formatter, '_frozen', True)
+            # another thread may have created one first, all callers get the same formatter
+            formatter = _shared_formatters.setdefault(key, formatter)
+        return formatter
+
+    def formatRoshChodesh(self, jewishCalendar, config=None):
         """Return string in English or Hebrew eg. "Rosh Chodesh Tammuz"."""
+        if config is None:
+            config = self.config
         if not jewishCalendar.isRoshChodesh():
             return ""
         formatted_rosh_chodesh = ""
@@ -183,109 +491,119 @@ class HebrewDateFormatter(object):
                 month += 1
             else: # roll to Nissan
                 month = JewishCalendar.NISSAN
-        if self.hebrew:
+        if config.hebrew:
             formatted_rosh_chodesh = self.hebrew_holidays[JewishCalendar.ROSH_CHODESH]
         else:
             formatted_rosh_chodesh = self.transliterated_holidays[JewishCalendar.ROSH_CHODESH]
-        formatted_rosh_chodesh += " " + self.format_month(month)
+        formatted_rosh_chodesh += " " + self._render('format_month', month, config)
         return formatted_rosh_chodesh
 
 
-    def a(self, jewishdate):
+    def a(self, jewishdate, config=None):
         return self.hebrewDaysOfWeek[jewishdate.dayofweek - 1]
 
-    def A(self, jewishdate):
+    def A(self, jewishdate, config=None):
         if jewishdate.dayofweek == 7:
             return self.transliterated_shabbos
         else:
             return jewishdate.dt.strftime('%A')
 
-    def c(self, jewishdate):
-        return self.formatHebrewNumber(jewishdate.dayofweek)
+    def c(self, jewishdate, config=None):
+        return self._format_number(jewishdate.dayofweek, config or self.config)
 
 
     
 
 
-    def formatDayOfWeek(self, jewishdate):
+    def formatDayOfWeek(self, jewishdate, config=None):
         """Return String of day of week in english or Hebrew."""
-        if self.hebrew:
-            if self.long_week_format:
-                return self.a(jewishdate)
+        if config is None:
+            config = self.config
+        if config.hebrew:
+            if config.long_week_format:
+                return self._render('a', jewishdate, config)
             else:
-                return self.c(jewishdate)
+                return self._render('c', jewishdate, config)
         else:
-            return self.A(jewishdate)
+            return self._render('A', jewishdate, config)
 
 
-    def d(self, jewishdate):
+    def d(self, jewishdate, config=None):
         return '{:02d}'.format(jewishdate.jday)
 
-    def D(self, jewishdate):
+    def D(self, jewishdate, config=None):
         return str(jewishdate.jday)
 
-    def m(self, jewishdate):
+    def m(self, jewishdate, config=None):
         return '{:02d}'.format(jewishdate.jmonth)
 
-    def M(self, jewishdate):
+    def M(self, jewishdate, config=None):
         return str(jewishdate.jmonth)
 
 
-    def e(self, jewishdate):
-        current_geresh = self.use_gersh_gershayim
-        self.use_gersh_gershayim = True
-        value = self.formatHebrewNumber(jewishdate.jday)
-        self.use_gersh_gershayim = current_geresh
-        return value
+    def e(self, jewishdate, config=None):
+        return self._hebrew_number(jewishdate.jday, True,
+                                   (config or self.config).use_long_hebrew_years)
 
-    def E(self, jewishdate):
-        current_geresh = self.use_gersh_gershayim
-        self.use_gersh_gershayim = False
-        value = self.formatHebrewNumber(jewishdate.jday)
-        self.use_gersh_gershayim = current_geresh
-        return value
+    def E(self, jewishdate, config=None):
+        return self._hebrew_number(jewishdate.jday, False,
+                                   (config or self.config).use_long_hebrew_years)
 
-    def y(self, jewishdate):
-        current_long_jyear = self.use_long_hebrew_years
-        self.use_long_hebrew_years = False
-        value = self.formatHebrewNumber(jewishdate.jyear)
-        self.use_long_hebrew_years = current_long_jyear
-        return value
+    def y(self, jewishdate, config=None):
+        return self._hebrew_number(jewishdate.jyear, (config or self.config).use_gersh_gershayim,
+                                   False)
 
-    def Y(self, jewishdate):
+    def Y(self, jewishdate, config=None):
         return str(jewishdate.jyear)
             
 
-    def format_parsha(self, jewish_calendar):
+    def format_parsha(self, jewish_calendar, config=None):
         """Return a string of the parsha name"""
         index = jewish_calendar.get_parsha_index()
         if index is None:
             return ""
         else:
-            if self.hebrew:
+            if (config or self.config).hebrew:
                 return self.hebrew_parshiyos[index]
             else:
                 return self.transliterated_parshios[index]
 
-    def format_date(self, jewish_date):
+    def format_date(self, jewish_date, config=None):
         """Return string of Jewish Date in format "d m y" in english or Hebrew"""
-        if self.hebrew:
-            return (self.formatHebrewNumber(jewish_date.jday) + " " + self.format_month(jewish_date)
-                    + " " + self.formatHebrewNumber(jewish_date.jyear))
+        if config is None:
+            config = self.config
+        return (self._format_day_of_date(jewish_date, config)
+                + self._format_month_and_year(jewish_date, config))
+
+    def _format_day_of_date(self, jewish_date, config):
+        """Returns the day of month part of format_date"""
+        if config.hebrew:
+            return self._format_number(jewish_date.jday, config)
         else:
-            return (str(jewish_date.jday) + " " + self.format_month(jewish_date) + ", "
-                    + str(jewish_date.jyear))
+            return str(jewish_date.jday)
+
+    def _format_month_and_year(self, jewish_date, config):
+        """Returns the month and year part of format_date"""
+        if type(self) is not HebrewDateFormatter or self._own_directives:
+            month = self._render('format_month', jewish_date, config)
+        else:
+            month = self.format_month(jewish_date, config)
+        if config.hebrew:
+            return " " + month + " " + self._format_number(jewish_date.jyear, config)
+        else:
+            return " " + month + ", " + str(jewish_date.jyear)
 
     
 
-    def b(self, jewishdate):
+    def b(self, jewishdate, config=None):
+        use_gersh_gershayim = (config or self.config).use_gersh_gershayim
         if jewishdate.jmonth == JewishDate.ADAR and jewishdate.is_jyear_leap():
-            if self.use_gersh_gershayim:
+            if use_gersh_gershayim:
                 return self.hebrew_months[13] + self.GERESH
             else:
                 return self.hebrew_months[13]
         elif jewishdate.jmonth == JewishDate.ADAR_II and jewishdate.is_jyear_leap(): # return Adar I, not Adar in a leap year
-            if self.use_gersh_gershayim:
+            if use_gersh_gershayim:
                 return self.hebrew_months[12] + self.GERESH
             else:
                 return self.hebrew_months[12]
@@ -293,28 +611,34 @@ class HebrewDateFormatter(object):
             return self.hebrew_months[jewishdate.jmonth - 1]
 
 
-    def B(self, jewishdate):
+    def B(self, jewishdate, config=None):
         if jewishdate.jmonth == JewishDate.ADAR and jewishdate.is_jyear_leap():
             return self.transliterated_months[13] # return Adar I, not Adar in a leap year
         else:
             return self.transliterated_months[jewishdate.jmonth - 1]
 
 
-    def format_month(self, jewishdate):
+    def format_month(self, jewishdate, config=None):
         """Returns a string of the current Hebrew month such as "Tishrei". or "תשרי". """
-        if self.hebrew:
-            return self.b(jewishdate)
+        if config is None:
+            config = self.config
+        if type(self) is not HebrewDateFormatter or self._own_directives:
+            return self._render('b' if config.hebrew else 'B', jewishdate, config)
+        if config.hebrew:
+            return self.b(jewishdate, config)
         else:
-            return self.B(jewishdate)
+            return self.B(jewishdate, config)
             
 
-    def formatOmer(self, jewishCalendar):
+    def formatOmer(self, jewishCalendar, config=None):
         """Return string of day of omer - or Empty string if none"""
+        if config is None:
+            config = self.config
         omer = jewishCalendar.getDayOfOmer()
         if not omer:
             return ""
-        if self.hebrew:
-            return self.formatHebrewNumber(omer) + " " + self.hebrew_omer_prefix + "עומר"
+        if config.hebrew:
+            return self._format_number(omer, config) + " " + self.hebrew_omer_prefix + "עומר"
         else:
             if omer == 33: # if lag b'omer
                 return "Lag BaOmer"
@@ -333,7 +657,7 @@ class HebrewDateFormatter(object):
         m, chalakim = divmod(chalakim, MINUTE_CHALAKIM)  # minutes
         return "Day: %s, hours: %s, minutes:  %s, chalakim: %s" % (d%7, h, m, chalakim)
 
-    def getFormattedKviah(self, jewishYear):
+    def getFormattedKviah(self, jewishYear, config=None):
         """Returns the kviah in the traditional 3 letter Hebrew format where the first
         letter represents the day of week of Rosh Hashana, the second letter represents
         the lengths of Cheshvan and Kislev and the 3rd letter represents the day of
@@ -342,7 +666,9 @@ class HebrewDateFormatter(object):
         jewishDate = JewishDate(jewishYear, JewishDate.TISHREI, 1) # set date to Rosh Hashana
         kviah = jewishDate.get_cheshvan_kislev_kviah()
         roshHashanaDayOfweek = jewishDate.dayofweek
-        returnValue = self.formatHebrewNumber(roshHashanaDayOfweek)
+        if config is None:
+            config = self.config
+        returnValue = self._format_number(roshHashanaDayOfweek, config)
         if kviah == JewishDate.CHASERIM:
             returnValue += "ח"
         elif kviah == JewishDate.SHELAIMIM:
@@ -351,7 +677,7 @@ class HebrewDateFormatter(object):
             returnValue += "כ"
         jewishDate.set_jdate(jewishYear, JewishDate.NISSAN, 15) # set to Pesach of the given year
         pesachDayOfweek = jewishDate.dayofweek
-        returnValue += self.formatHebrewNumber(pesachDayOfweek)
+        returnValue += self._format_number(pesachDayOfweek, config)
         returnValue = returnValue.replace(self.GERESH, "")  # geresh is never used in the kviah format
         # boolean isLeapYear = JewishDate.isJewishLeapYear(jewishYear)
         # for efficiency we can avoid the expensive recalculation of the pesach day of week by adding 1 day to Rosh
@@ -359,17 +685,52 @@ class HebrewDateFormatter(object):
         # a 385 day year
         return returnValue
 
-    def formatDafYomiBavli(self, daf):
+    def formatDafYomiBavli(self, daf, config=None):
         """Return a formatted Daf Yomi of the Day in English or Hebrew
         takes a tuple rurned by JewishCalendar.getDafYomiBavli()
         """
-        if self.hebrew:
-            return self.masechtos_bavli[daf[0]] + " " + self.formatHebrewNumber(daf[1])
+        if config is None:
+            config = self.config
+        if config.hebrew:
+            return self.masechtos_bavli[daf[0]] + " " + self._format_number(daf[1], config)
         else:
             return self.masechtos_bavli_transliterated[daf[0]] + " " + daf[1]
 
     def formatHebrewNumber(self, number):
-        """Returns a Hebrew formatted string of a number. The method can calculate from 0 - 9999"""
+        """Returns a Hebrew formatted string of a number. The method can calculate from 0 - 9999.
+        Every string is built once per setting and looked up after that.
+        """
+        config = self.config
+        return self._get_hebrew_number(number, config.use_gersh_gershayim,
+                                       config.use_long_hebrew_years)
+
+    def _get_hebrew_number(self, number, use_gersh_gershayim, use_long_hebrew_years):
+        """Returns the string of formatHebrewNumber with the settings given"""
+        key = (self.__class__, use_gersh_gershayim, use_long_hebrew_years)
+        try:
+            return _hebrew_numbers[key][number]
+        except KeyError:
+            pass
+        value = self._build_hebrew_number(number, use_gersh_gershayim, use_long_hebrew_years)
+        _hebrew_numbers.setdefault(key, {})[number] = value
+        return value
+
+    def _format_number(self, number, config):
+        """Returns formatHebrewNumber with the settings of the config"""
+        return self._hebrew_number(number, config.use_gersh_gershayim,
+                                   config.use_long_hebrew_years)
+
+    def _hebrew_number(self, number, use_gersh_gershayim, use_long_hebrew_years):
+        """Returns formatHebrewNumber with the settings given. A formatHebrewNumber the class or
+        the formatter overrides is called with the number only, see CONFIG_METHODS.
+        """
+        if (type(self).formatHebrewNumber is not HebrewDateFormatter.formatHebrewNumber
+                or self._own_directives and 'formatHebrewNumber' in self.__dict__):
+            return self.formatHebrewNumber(number)
+        return self._get_hebrew_number(number, use_gersh_gershayim, use_long_hebrew_years)
+
+    def _build_hebrew_number(self, number, use_gersh_gershayim, use_long_hebrew_years):
+        """Builds the string returned by formatHebrewNumber"""
         if (number < 0):
             raise ValueError("negative numbers can't be formatted")
         elif (number > 9999):
@@ -393,15 +754,15 @@ class HebrewDateFormatter(object):
         # append thousands to String
         if not shortNumber: # in year is 5000, 4000 etc
             sb.append(jOnes[thousands])
-            if self.use_gersh_gershayim:
-                sb.append(GERESH)
+            if use_gersh_gershayim:
+                sb.append(self.GERESH)
             sb.append(" ")
             sb.append(ALAFIM) # add # of thousands plus word thousand (overide alafim boolean)
             return "".join(sb)
-        elif (self.use_long_hebrew_years and thousands): # if alafim boolean display thousands
+        elif (use_long_hebrew_years and thousands): # if alafim boolean display thousands
             sb.append(jOnes[thousands])
-            if self.use_gersh_gershayim:
-                sb.append(GERESH) # append thousands quote
+            if use_gersh_gershayim:
+                sb.append(self.GERESH) # append thousands quote
             sb.append(" ")
         hundreds, number = divmod(shortNumber, 100)
         sb.append(jHundreds[hundreds]) # add hundreds to String
@@ -422,7 +783,7 @@ class HebrewDateFormatter(object):
                 sb.append(jTens[tens])
                 sb.append(jOnes[ones])
 
-        if self.use_gersh_gershayim:
+        if use_gersh_gershayim:
             if singleDigitNumber:
                 sb.append(self.GERESH)  # append single quote
             else: # append double quote before last digit
@@ -431,3 +792,26 @@ class HebrewDateFormatter(object):
                 sb.append(a)
     
         return "".join(sb)
+
+
+# what the result of a directive depends on, see HebrewDateFormatter.format_many. Results for
+# the same key are reused, unless one of the methods the directive uses is overridden.
+_RUN_KEYS = {
+    HebrewDateFormatter.a: (attrgetter('dayofweek'), ('a',)),
+    HebrewDateFormatter.A: (attrgetter('dayofweek'), ('A',)),
+    HebrewDateFormatter.c: (attrgetter('dayofweek'), ('c', 'formatHebrewNumber')),
+    HebrewDateFormatter.d: (attrgetter('jday'), ('d',)),
+    HebrewDateFormatter.D: (attrgetter('jday'), ('D',)),
+    HebrewDateFormatter.e: (attrgetter('jday'), ('e', 'formatHebrewNumber')),
+    HebrewDateFormatter.E: (attrgetter('jday'), ('E', 'formatHebrewNumber')),
+    HebrewDateFormatter.m: (attrgetter('jmonth'), ('m',)),
+    HebrewDateFormatter.M: (attrgetter('jmonth'), ('M',)),
+    # Adar is Adar I on a leap year
+    HebrewDateFormatter.b: (attrgetter('jyear', 'jmonth'), ('b',)),
+    HebrewDateFormatter.B: (attrgetter('jyear', 'jmonth'), ('B',)),
+    HebrewDateFormatter.y: (attrgetter('jyear'), ('y', 'formatHebrewNumber')),
+    HebrewDateFormatter.Y: (attrgetter('jyear'), ('Y',)),
+    HebrewDateFormatter._format_day_of_date: (attrgetter('jday'), ('formatHebrewNumber',)),
+    HebrewDateFormatter._format_month_and_year: (attrgetter('jyear', 'jmonth'),
+                                                 ('format_month', 'b', 'B', 'formatHebrewNumber')),
+}
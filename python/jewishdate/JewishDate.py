@@ -1,5 +1,12 @@
 """This is the module Docstring"""
+from array import array
+from bisect import bisect_right
+from collections import namedtuple, OrderedDict
 from datetime import date, datetime, timedelta
+from functools import total_ordering
+import os
+import struct
+import sys
 
 NISSAN = 1
 IYAR = 2
@@ -24,9 +31,10 @@ CHASERIM = 0  # Cheshvan and Kislev both 29 days
 KESIDRAN = 1  # Cheshvan 29 days and Kislev 30 days
 SHELAIMIM = 2  # Cheshvan and Kislev both 30 days
 
-def get_jcal_elapsed_days(year):
-    """Returns the number of days elapsed from the Sunday prior to the start of the Jewish calendar
-    to the mean conjunction of Tishri of the Jewish year.
+def _get_jcal_elapsed_days(year):
+    """Computes the number of days elapsed from the Sunday prior to the start of the Jewish
+    calendar to the mean conjunction of Tishri of the Jewish year. This does the full molad and
+    dechiyos calculation, use get_jcal_elapsed_days which caches the result.
     """
     # Jewish lunar month = 29 days, 12 hours and 793 chalakim
     # chalakim since Molad Tohu BeHaRaD - 1 day, 5 hours and 204 chalakim
@@ -58,6 +66,221 @@ def get_jcal_elapsed_days(year):
         rosh_hashana_day += 1 # Then postpone it one (more) day
     return rosh_hashana_day
 
+JewishYearInfo = namedtuple('JewishYearInfo', ['elapsed_days', 'rosh_hashana', 'days', 'leap',
+                                               'kviah', 'month_lengths', 'month_starts',
+                                               'month_offsets'])
+JewishYearInfo.__doc__ = """Calendar metadata of a Jewish year.
+
+elapsed_days -- days from the Sunday prior to the start of the Jewish calendar to Rosh Hashana
+rosh_hashana -- absolute date (Gregorian ordinal) of 1 Tishrei
+days -- number of days in the year
+leap -- True on a leap year
+kviah -- CHASERIM, KESIDRAN or SHELAIMIM
+month_lengths -- days in each month indexed by month (Nissan = 1, Adar II = 13)
+month_starts -- days from Rosh Hashana to the 1st of each month indexed by month
+month_offsets -- month_starts in calendar order (Tishrei first), as listed by YEAR_MONTHS or
+LEAP_YEAR_MONTHS
+"""
+YEAR_MONTHS = (TISHREI, CHESHVAN, KISLEV, TEVES, SHEVAT, ADAR,
+               NISSAN, IYAR, SIVAN, TAMUZ, AV, ELUL)
+LEAP_YEAR_MONTHS = (TISHREI, CHESHVAN, KISLEV, TEVES, SHEVAT, ADAR, ADAR_II,
+                    NISSAN, IYAR, SIVAN, TAMUZ, AV, ELUL)
+# the mean Jewish year is 235 months / 19 years, 35975351 / 98496 days
+MEAN_YEAR_DAYS_NUMERATOR = 35975351
+MEAN_YEAR_DAYS_DENOMINATOR = 98496
+
+# The Rosh Hashana, number of days and leap flag of the years PACKED_FIRST_JYEAR -
+# PACKED_LAST_JYEAR are read from a table instead of doing the molad and dechiyos calculation.
+# The table is calculated the first time it is needed, and kept in memory, which forked workers
+# share. With $JEWISHDATE_TABLE it is kept in that file instead, written the first time and
+# memory mapped read only, so every process using the file shares the same pages. After a
+# header the table has a column of int32 Rosh Hashana absolute dates, a column of uint16 year
+# lengths and a column of uint8 leap flags, all in native byte order.
+PACKED_FIRST_JYEAR = 3761 # year of 1/1/1 Gregorian
+PACKED_LAST_JYEAR = 10000
+PACKED_TABLE_VERSION = 2
+# magic, version, big endian, first year, last year, CRC-32 of the columns
+PACKED_TABLE_HEADER = struct.Struct('<4sBBxxiiI')
+_PACKED_TABLE_MAGIC = b'JYTB'
+_PACKED_YEARS = PACKED_LAST_JYEAR - PACKED_FIRST_JYEAR + 1
+# the Rosh Hashana, days and leap columns of the table as memoryviews, set by load_packed_table
+# in one assignment so other threads never see part of them
+_packed_table = None
+
+def get_packed_table_path():
+    """Returns the path of the table file, $JEWISHDATE_TABLE, or None if it isn't set and the
+    table is kept in memory
+    """
+    return os.environ.get('JEWISHDATE_TABLE') or None
+
+def _build_packed_table():
+    """Calculates the years of the table and returns the contents of the table file"""
+    import zlib # only needed once the table is used, not on import
+    years = range(PACKED_FIRST_JYEAR, PACKED_LAST_JYEAR + 2)
+    elapsed = [_get_jcal_elapsed_days(year) for year in years]
+    rosh_hashana = array('i', [days + JEWISH_EPOCH + 1 for days in elapsed[:-1]])
+    days = array('H', [after - before for before, after in zip(elapsed, elapsed[1:])])
+    leap = array('B', [is_jyear_leap(year) for year in years[:-1]])
+    columns = rosh_hashana.tobytes() + days.tobytes() + leap.tobytes()
+    header = PACKED_TABLE_HEADER.pack(_PACKED_TABLE_MAGIC, PACKED_TABLE_VERSION,
+                                      sys.byteorder == 'big', PACKED_FIRST_JYEAR,
+                                      PACKED_LAST_JYEAR, zlib.crc32(columns) & 0xffffffff)
+    return header + columns
+
+def _is_packed_table_valid(data):
+    """Returns True if data has the header and size of a table written by this version, and
+    columns matching the header's checksum
+    """
+    import zlib
+    size = PACKED_TABLE_HEADER.size + _PACKED_YEARS * 7
+    if len(data) != size:
+        return False
+    magic, version, big_endian, first, last, checksum = PACKED_TABLE_HEADER.unpack_from(data)
+    return ((magic, version, big_endian, first, last) ==
+            (_PACKED_TABLE_MAGIC, PACKED_TABLE_VERSION, sys.byteorder == 'big',
+             PACKED_FIRST_JYEAR, PACKED_LAST_JYEAR)
+            and zlib.crc32(data[PACKED_TABLE_HEADER.size:]) & 0xffffffff == checksum)
+
+def _map_packed_table(path):
+    """Returns a read only mmap of the table file, or None if it is missing or invalid"""
+    import mmap # only needed once the table is used, not on import
+    try:
+        with open(path, 'rb') as table_file:
+            data = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (IOError, OSError, ValueError): # ValueError for an empty file
+        return None
+    if not _is_packed_table_valid(data):
+        data.close()
+        return None
+    return data
+
+def _write_packed_table(path, contents):
+    """Writes the table file. It is written to a temporary file first and renamed, so other
+    processes never see a partial table.
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    temp_path = '%s.%s.tmp' % (path, os.getpid())
+    with open(temp_path, 'wb') as table_file:
+        table_file.write(contents)
+    os.replace(temp_path, path)
+
+def load_packed_table(path=None):
+    """Memory maps the table file (by default from get_packed_table_path), generating it if it
+    is missing or invalid. Without a path, or if the file can't be written, the table is kept in
+    memory. This is done automatically the first time a year of the table is used. Returns the
+    columns.
+    """
+    global _packed_table
+    path = path or get_packed_table_path()
+    data = _map_packed_table(path) if path else _build_packed_table()
+    if data is None:
+        contents = _build_packed_table()
+        try:
+            _write_packed_table(path, contents)
+        except (IOError, OSError):
+            data = contents
+        else:
+            data = _map_packed_table(path) or contents
+    for days in YEAR_LENGTHS: # so _month_starts and _month_offsets have every length
+        _get_year_layout(days)
+    view = memoryview(data)[PACKED_TABLE_HEADER.size:]
+    _packed_table = (view[:_PACKED_YEARS * 4].cast('i'),
+                     view[_PACKED_YEARS * 4:_PACKED_YEARS * 6].cast('H'),
+                     view[_PACKED_YEARS * 6:])
+    return _packed_table
+
+def _get_jyear_record(year):
+    """Returns a tuple of (absolute date of Rosh Hashana, days in year, leap) of a Jewish year,
+    from the table file for the years it covers. Other years are calculated, use get_jyear_info
+    for those.
+    """
+    index = year - PACKED_FIRST_JYEAR
+    if 0 <= index < _PACKED_YEARS:
+        rosh_hashana, days, leap = _packed_table or load_packed_table()
+        return rosh_hashana[index], days[index], leap[index] == 1
+    elapsed_days = _get_jcal_elapsed_days(year)
+    return (elapsed_days + JEWISH_EPOCH + 1, _get_jcal_elapsed_days(year + 1) - elapsed_days,
+            is_jyear_leap(year))
+
+YEAR_LENGTHS = (353, 354, 355, 383, 384, 385) # every possible number of days in a year
+_year_layouts = {}
+_month_starts = {} # month_starts of JewishYearInfo by the number of days in the year
+_month_offsets = {} # month_offsets of JewishYearInfo by the number of days in the year
+
+def _get_year_layout(days):
+    """Returns a tuple of (kviah, month_lengths, month_starts, month_offsets) for a year with the
+    number of days, see JewishYearInfo. The months only depend on the length of the year.
+    """
+    layout = _year_layouts.get(days)
+    if layout is not None:
+        return layout
+    leap = days > 380
+    cheshvan_days = 30 if days % 10 == 5 else 29
+    kislev_days = 29 if days % 10 == 3 else 30
+    if cheshvan_days + kislev_days == 60:
+        kviah = SHELAIMIM
+    elif cheshvan_days + kislev_days == 58:
+        kviah = CHASERIM
+    else:
+        kviah = KESIDRAN
+    month_lengths = (0, 30, 29, 30, 29, 30, 29, 30, cheshvan_days, kislev_days, 29, 30,
+                     30 if leap else 29, 29)
+    # days from Rosh Hashana to the 1st of every month. The year starts with Tishrei and
+    # Nissan follows Adar (Adar II on a leap year)
+    month_starts = [0] * 14
+    elapsed = 0
+    for month in range(TISHREI, ADAR_II + 1):
+        month_starts[month] = elapsed
+        if month != ADAR_II or leap:
+            elapsed += month_lengths[month]
+    for month in range(NISSAN, TISHREI):
+        month_starts[month] = elapsed
+        elapsed += month_lengths[month]
+    months = LEAP_YEAR_MONTHS if leap else YEAR_MONTHS
+    layout = _year_layouts[days] = (kviah, month_lengths, tuple(month_starts),
+                                    tuple(month_starts[month] for month in months))
+    _month_starts[days] = layout[2]
+    _month_offsets[days] = layout[3]
+    return layout
+
+def _compute_jyear_info(year):
+    """Computes the JewishYearInfo of a Jewish year. Use get_jyear_info for the cached version."""
+    rosh_hashana, days, leap = _get_jyear_record(year)
+    return JewishYearInfo(*((rosh_hashana - JEWISH_EPOCH - 1, rosh_hashana, days, leap)
+                            + _get_year_layout(days)))
+
+JYEAR_CACHE_SIZE = 10240 # years kept by get_jyear_info. Covers every year a datetime can reach
+_jyear_info_cache = OrderedDict()
+
+def get_jyear_info(year):
+    """Returns the JewishYearInfo of a Jewish year. The molad and dechiyos calculation is only
+    done the first time a year is requested, the last JYEAR_CACHE_SIZE years are kept.
+    """
+    try:
+        return _jyear_info_cache[year]
+    except KeyError:
+        pass
+    info = _compute_jyear_info(year)
+    if len(_jyear_info_cache) >= JYEAR_CACHE_SIZE:
+        _jyear_info_cache.popitem(last=False)
+    _jyear_info_cache[year] = info
+    return info
+
+def clear_jyear_cache():
+    """Empties the cache used by get_jyear_info"""
+    _jyear_info_cache.clear()
+
+def get_jcal_elapsed_days(year):
+    """Returns the number of days elapsed from the Sunday prior to the start of the Jewish calendar
+    to the mean conjunction of Tishri of the Jewish year.
+    """
+    index = year - PACKED_FIRST_JYEAR
+    if 0 <= index < _PACKED_YEARS:
+        return (_packed_table or load_packed_table())[0][index] - JEWISH_EPOCH - 1
+    return get_jyear_info(year).elapsed_days
+
 def get_chalakim_since_molad_tohu(year, month):
     """Returns the number of chalakim (parts - 1080 to the hour) from the original hypothetical
     Molad Tohu to the year and month passed in.
@@ -72,6 +295,66 @@ def get_chalakim_since_molad_tohu(year, month):
     # return chalakim prior to BeHaRaD + number of chalakim since
     return CHALAKIM_MOLAD_TOHU + (CHALAKIM_PER_MONTH * months)
 
+Molados = namedtuple('Molados', 'years months molads days hours minutes chalakim')
+Molados.__doc__ = """Molad columns returned by get_molados, one array.array per field.
+molads are chalakim since the Sunday before Molad Tohu, as from get_chalakim_since_molad_tohu.
+days are absolute dates (Gregorian ordinals) and hours, minutes and chalakim the time of the
+molad on that day, with the date rolling over at midnight like JewishDate.get_molad.
+"""
+
+def _split_molad(molad):
+    """Returns a tuple of (absolute date, hours, minutes, chalakim) of a molad given in chalakim
+    since molad tohu. The molad day starts at 18:00 of the civil day before, so the time is moved
+    to a midnight rollover.
+    """
+    molad_day, chalakim = divmod(molad, CHALAKIM_PER_DAY)
+    hours, chalakim = divmod(chalakim, CHALAKIM_PER_HOUR)
+    minutes, chalakim = divmod(chalakim, CHALAKIM_PER_MINUTE)
+    molad_day += JEWISH_EPOCH
+    if hours >= 6:
+        molad_day += 1
+    return molad_day, (hours + 18) % 24, minutes, chalakim
+
+def get_molad(year, month):
+    """Returns a tuple of (absolute date, hours, minutes, chalakim) of the molad of a Jewish
+    month. Rosh Chodesh Adar II, 5771 has a molad of 7 chalakim past midnight on March 5, 2011,
+    which is returned as (734201, 0, 0, 7).
+    """
+    return _split_molad(get_chalakim_since_molad_tohu(year, month))
+
+def get_molados(year, month, count):
+    """Returns the Molados of count months in calendar order, starting with the Jewish year and
+    month. Every molad is CHALAKIM_PER_MONTH after the one before, so only integers are used.
+    """
+    molad = get_chalakim_since_molad_tohu(year, month)
+    molados = Molados(array('i'), array('b'), array('q'), array('i'), array('b'), array('b'),
+                      array('b'))
+    months = LEAP_YEAR_MONTHS if is_jyear_leap(year) else YEAR_MONTHS
+    index = months.index(month)
+    for _ in range(count):
+        molad_day, hours, minutes, chalakim = _split_molad(molad)
+        molados.years.append(year)
+        molados.months.append(months[index])
+        molados.molads.append(molad)
+        molados.days.append(molad_day)
+        molados.hours.append(hours)
+        molados.minutes.append(minutes)
+        molados.chalakim.append(chalakim)
+        molad += CHALAKIM_PER_MONTH
+        index += 1
+        if index == len(months):
+            year += 1
+            months = LEAP_YEAR_MONTHS if is_jyear_leap(year) else YEAR_MONTHS
+            index = 0
+    return molados
+
+def get_jyear_molados(start_year, stop_year):
+    """Returns the Molados of every month of the Jewish years from start_year up to (not
+    including) stop_year, starting with Tishrei.
+    """
+    count = _get_months_before_jyear(stop_year) - _get_months_before_jyear(start_year)
+    return get_molados(start_year, TISHREI, max(count, 0))
+
 def jdate_to_abs_date(year, month, day):
     """Returns the absolute date of Jewish date. ND+ER
     Arguments:
@@ -79,19 +362,36 @@ def jdate_to_abs_date(year, month, day):
     month -- Nissan =1 and Adar II = 13
     day -- day of month
     """
-    elapsed_days = day
-    # Before Tishrei (from Nissan to Tishrei), add days in prior months
-    if month < TISHREI:
-        # this year before and after Nisan.
-        for mon in range(TISHREI, getLastMonthOfJewishYear(year)+1):
-            elapsed_days += get_days_in_jmonth(mon, year)
-        for mon in range(NISSAN, month):
-            elapsed_days += get_days_in_jmonth(mon, year)
-    else: # Add days in prior months this year
-        for mon in range(TISHREI, month):
-            elapsed_days += get_days_in_jmonth(mon, year)
-    # add elapsed days this year + Days in prior years + Days elapsed before absolute year 1
-    return int(elapsed_days + get_jcal_elapsed_days(year) + JEWISH_EPOCH)
+    # add days since Rosh Hashana to the absolute date of Rosh Hashana
+    index = year - PACKED_FIRST_JYEAR
+    if 0 <= index < _PACKED_YEARS:
+        rosh_hashana, days, _ = _packed_table or load_packed_table()
+        return rosh_hashana[index] + _month_starts[days[index]][month] + day - 1
+    info = get_jyear_info(year)
+    return int(info.rosh_hashana + info.month_starts[month] + day - 1)
+
+def _get_months_before_jyear(year):
+    """Returns the number of months from the start of the calendar to Tishrei of the year"""
+    metonic_cycles, year_in_cycle = divmod(year - 1, 19)
+    return metonic_cycles * 235 + year_in_cycle * 12 + (7 * year_in_cycle + 1) // 19
+
+def add_jmonths(year, month, months):
+    """Returns a tuple of (year, month) months after (or before for a negative number) the
+    Jewish year and month. Months are counted in calendar order, so a leap year has 13 of them:
+    one month after Shevat is Adar I, two months after Shevat is Adar II.
+    """
+    index = _get_months_before_jyear(year) + get_jmonth_of_year(year, month) - 1 + months
+    year = index * 19 // 235 + 1 # estimate, it can be off by one
+    if _get_months_before_jyear(year) > index:
+        year -= 1
+    elif _get_months_before_jyear(year + 1) <= index:
+        year += 1
+    month_of_year = index - _get_months_before_jyear(year) + 1 # Tishrei = 1
+    if month_of_year <= 6: # Tishrei to Adar (Adar I on a leap year)
+        return (year, month_of_year + 6)
+    if not is_jyear_leap(year):
+        return (year, month_of_year - 6)
+    return (year, ADAR_II if month_of_year == 7 else month_of_year - 7)
 
 def getLastMonthOfJewishYear(year):
     """Return the last month of a given Jewish year. This will be 12 but 13 on leap year"""
@@ -106,7 +406,10 @@ def get_jmonth_of_year(year, month):
 
 def get_days_in_jyear(year):
     """Returns the number of days for a given Jewish year. ND+ER"""
-    return get_jcal_elapsed_days(year + 1) - get_jcal_elapsed_days(year)
+    index = year - PACKED_FIRST_JYEAR
+    if 0 <= index < _PACKED_YEARS:
+        return (_packed_table or load_packed_table())[1][index]
+    return get_jyear_info(year).days
 
 def is_jyear_leap(year):
     """Return True if the year is a Jewish leap year.
@@ -145,41 +448,113 @@ def get_days_in_jmonth(month, year):
         return 29
     return 30
 
+def get_yahrzeit(jyear, jmonth, jday, target_jyear):
+    """Returns the absolute date of the yahrzeit in target_jyear of a death on the Jewish date,
+    or None if target_jyear isn't after the year of death.
+    - 30 Cheshvan (30 Kislev) is kept on the last day of Cheshvan (Kislev) if the month had
+      29 days on the first yahrzeit, otherwise on 30 Cheshvan (Kislev) or Rosh Chodesh if the
+      month is short.
+    - Adar II is kept in Adar II on a leap year and in Adar on a regular year, Adar of a regular
+      year is kept in Adar I.
+    - 30 Adar I is kept on 30 Shevat on a regular year.
+    """
+    if target_jyear <= jyear:
+        return None
+    return _get_yahrzeit(jmonth, jday, get_yahrzeit_signature(jyear, jmonth, jday), target_jyear)
+
+def get_yahrzeit_signature(jyear, jmonth, jday):
+    """Returns the part of the year of death that the yahrzeit depends on besides the month and
+    day: True for 30 Cheshvan (Kislev) when the month is short on the first yahrzeit.
+    """
+    return (jday == 30 and jmonth in (CHESHVAN, KISLEV)
+            and get_jyear_info(jyear + 1).month_lengths[jmonth] == 29)
+
+def _get_yahrzeit(jmonth, jday, signature, target_jyear):
+    """Returns the absolute date of the yahrzeit, see get_yahrzeit and get_yahrzeit_signature"""
+    info = get_jyear_info(target_jyear)
+    if signature:
+        # the day before Rosh Chodesh
+        return info.rosh_hashana + info.month_starts[jmonth + 1] - 1
+    if jmonth == ADAR_II:
+        jmonth = ADAR_II if info.leap else ADAR
+    elif jmonth == ADAR and jday == 30 and not info.leap:
+        jmonth = SHEVAT
+    elif jday == 30 and info.month_lengths[jmonth] == 29: # Cheshvan or Kislev
+        return info.rosh_hashana + info.month_starts[jmonth + 1]
+    return info.rosh_hashana + info.month_starts[jmonth] + jday - 1
+
+def get_anniversary(jyear, jmonth, jday, target_jyear):
+    """Returns the absolute date of the anniversary (birthday) in target_jyear of the Jewish
+    date, or None if target_jyear isn't after the year of the date.
+    - Adar II is kept in Adar II on a leap year and in Adar on a regular year, Adar of a regular
+      year is kept in Adar II on a leap year.
+    - 30 Cheshvan and 30 Kislev are kept on Rosh Chodesh (the 1st of the next month) when the
+      month is short, 30 Adar I on 1 Nissan on a regular year.
+    """
+    if target_jyear <= jyear:
+        return None
+    return _get_anniversary(jmonth, jday, get_anniversary_signature(jyear, jmonth, jday),
+                            target_jyear)
+
+def get_anniversary_signature(jyear, jmonth, jday):
+    """Returns the part of the year that the anniversary depends on besides the month and day:
+    True for Adar of a regular year.
+    """
+    return jmonth == ADAR and not is_jyear_leap(jyear)
+
+def _get_anniversary(jmonth, jday, signature, target_jyear):
+    """Returns the absolute date of the anniversary, see get_anniversary and
+    get_anniversary_signature
+    """
+    info = get_jyear_info(target_jyear)
+    if jmonth == ADAR_II:
+        jmonth = ADAR_II if info.leap else ADAR
+    elif signature and info.leap:
+        jmonth = ADAR_II
+    elif jday == 30 and info.month_lengths[jmonth] == 29:
+        # the month is short in the target year
+        jmonth = NISSAN if jmonth == ADAR else jmonth + 1
+        jday = 1
+    return info.rosh_hashana + info.month_starts[jmonth] + jday - 1
+
+def abs_date_to_jdate(abs_date):
+    """Returns a tuple of (jyear, jmonth, jday) for an absolute date (Gregorian ordinal).
+    The year is estimated from the mean year length and corrected by at most one year, the month
+    is found by bisecting the month offsets of the year.
+    """
+    jyear = ((abs_date - JEWISH_EPOCH) * MEAN_YEAR_DAYS_DENOMINATOR
+             // MEAN_YEAR_DAYS_NUMERATOR + 1)
+    index = jyear - PACKED_FIRST_JYEAR
+    if 0 < index < _PACKED_YEARS - 1:
+        rosh_hashanas, year_days, _ = _packed_table or load_packed_table()
+        rosh_hashana = rosh_hashanas[index]
+        if abs_date < rosh_hashana:
+            jyear -= 1
+            index -= 1
+            rosh_hashana = rosh_hashanas[index]
+        elif abs_date >= rosh_hashanas[index + 1]:
+            jyear += 1
+            index += 1
+            rosh_hashana = rosh_hashanas[index]
+        days = year_days[index]
+        month_offsets = _month_offsets[days]
+    else:
+        info = get_jyear_info(jyear)
+        if abs_date < info.rosh_hashana:
+            jyear -= 1
+            info = get_jyear_info(jyear)
+        elif abs_date >= info.rosh_hashana + info.days:
+            jyear += 1
+            info = get_jyear_info(jyear)
+        rosh_hashana, days, month_offsets = info.rosh_hashana, info.days, info.month_offsets
+    day_of_year = abs_date - rosh_hashana
+    month = bisect_right(month_offsets, day_of_year) - 1
+    jmonth = (LEAP_YEAR_MONTHS if days > 380 else YEAR_MONTHS)[month]
+    return (jyear, jmonth, day_of_year - month_offsets[month] + 1)
+
 def datetimeToJewishDate(dt):
     """Computes the Jewish date from the absolute date. ND+ER"""
-    abs_date = dt.toordinal()
-    # Start with approximation
-    jyear = dt.year + 3760
-    # Search forward for year from the approximation
-    tempabsdate = jdate_to_abs_date(jyear + 1, TISHREI, 1)
-    while abs_date >= tempabsdate:
-        jyear += 1
-        if abs_date - tempabsdate < 353:
-            break
-        tempabsdate = jdate_to_abs_date(jyear + 1, TISHREI, 1)
-    is_leap_year = is_jyear_leap(jyear)
-    #start with tishrei
-    jmonth = TISHREI
-    daysbeyond0ofjmonth = abs_date - jdate_to_abs_date(jyear, jmonth, 1)
-    daysinjmonth = get_days_in_jmonth(jmonth, jyear)
-    #go forward month by month
-    while daysbeyond0ofjmonth >= daysinjmonth:
-        jmonth += 1
-        if jmonth > 12:
-            if (not is_leap_year) or jmonth == 14:
-                jmonth = 1
-        daysbeyond0ofjmonth -= daysinjmonth
-        if jmonth == CHESHVAN:
-            cheshvandays, kislevdays = get_days_cheshvan_kislev(jyear)
-            if daysbeyond0ofjmonth >= cheshvandays:
-                jmonth += 1
-                daysbeyond0ofjmonth -= cheshvandays
-            if daysbeyond0ofjmonth >= kislevdays:
-                jmonth += 1
-                daysbeyond0ofjmonth -= kislevdays
-        daysinjmonth = get_days_in_jmonth(jmonth, jyear)
-    jday = daysbeyond0ofjmonth + 1
-    return (jyear, jmonth, jday)
+    return abs_date_to_jdate(dt.toordinal())
 
 def validateJewishDate(year, month, day, hours=0, minutes=0, chalakim=0):
     """Validates the components of a Jewish date for validity. It will throw a ValueError if the
@@ -226,6 +601,16 @@ def validateJewishDate(year, month, day, hours=0, minutes=0, chalakim=0):
                          in the case of 793 (TaShTzaG)""" % (chalakim))
     return (year, month, day, hours, minutes, chalakim)
 
+_formatters = {} # hebrew flag -> shared HebrewDateFormatter used by str, format and heb_string
+
+def _get_formatter(hebrew=False):
+    """Returns the shared HebrewDateFormatter of str, format and heb_string"""
+    try:
+        return _formatters[hebrew]
+    except KeyError:
+        from .HebrewDateFormatter import HebrewDateFormatter # it imports this module
+        return _formatters.setdefault(hebrew, HebrewDateFormatter.get_shared(hebrew))
+
 class JewishDate(object):
     """Creates a Jewish date
     Arguments:
@@ -233,6 +618,9 @@ class JewishDate(object):
     year -- the Jewish year. The year can't be negative
     month -- the Jewish month. Nissan = 1 Adar II = 13
     day -- the Jewish day of month
+
+    The date is kept as an absolute date (Gregorian ordinal). The Gregorian datetime and the
+    Jewish year, month and day are only calculated from it the first time they are used.
     """
 
     NISSAN = 1
@@ -264,7 +652,7 @@ class JewishDate(object):
 
     def toordinal(self):
         """Returns the absolute date (days since January 1, 0001 on the Gregorian calendar)."""
-        return self.dt.toordinal()
+        return self._ordinal
 
     def is_jyear_leap(self, year=None):
         """Return True if the year is a Jewish leap year.
@@ -272,25 +660,25 @@ class JewishDate(object):
         """
         if year:
             return is_jyear_leap(year)
-        return is_jyear_leap(self._jyear)
+        return is_jyear_leap(self.jyear)
 
     def get_days_in_jyear(self):
         """Returns the number of days for a given Jewish year. ND+ER"""
-        return get_days_in_jyear(self._jyear)
+        return get_days_in_jyear(self.jyear)
 
     def is_cheshvan_long(self):
         """Returns if Cheshvan is long in set Jewish year."""
-        return is_cheshvan_long(self._jyear)
+        return is_cheshvan_long(self.jyear)
 
     def is_kislev_short(self):
         """Returns if Kislev is short (29 days VS 30 days) in set Jewish year."""
-        return is_kislev_short(self._jyear)
+        return is_kislev_short(self.jyear)
 
     def get_cheshvan_kislev_kviah(self):
         """Returns the Cheshvan and Kislev kviah (whether a Jewish year is short, regular or long).
         Returns 0 for Chaseirim, 1 for Kesidron, and 2 for Shleimim
         """
-        cheshvan, kislev = get_days_cheshvan_kislev(self._jyear)
+        cheshvan, kislev = get_days_cheshvan_kislev(self.jyear)
         total = cheshvan + kislev
         if total == 60:
             return self.SHELAIMIM
@@ -307,11 +695,12 @@ class JewishDate(object):
         chalakim past midnight on Shabbos 29 Adar I / March 5, 2011 12:00 AM and 7 chalakim,
         will have the following values: hours: 0, minutes: 0, Chalakim: 7.
         """
-        molad_date = JewishDate.now()
-        molad_date.set_jdate_by_molad(get_chalakim_since_molad_tohu(self._jyear, self._jmonth))
-        if molad_date.molad_hours >= 6:
-            molad_date.forward()
-        molad_date._molad_hours = (molad_date.molad_hours + 18) % 24
+        molad_day, hours, minutes, chalakim = get_molad(self.jyear, self.jmonth)
+        molad_date = JewishDate(datetime.fromordinal(molad_day).replace(
+            hour=hours, minute=minutes, second=chalakim * 10 // 3))
+        molad_date._molad_hours = hours
+        molad_date._molad_minutes = minutes
+        molad_date._molad_chalakim = chalakim
         return molad_date
 
     def set_jdate_by_molad(self, molad):
@@ -325,8 +714,8 @@ class JewishDate(object):
         self.fromordinal(molad_abs_day + self.JEWISH_EPOCH) #maybe - jewihs epoch?
         self._molad_hours, chalakim = divmod(chalakim, self.CHALAKIM_PER_HOUR)
         self._molad_minutes, self._molad_chalakim = divmod(chalakim, self.CHALAKIM_PER_MINUTE)
-        self.dt = (self.dt.replace(hours=self._molad_hours, minutes=self._molad_minutes,
-                                   seconds=int(self._molad_chalakim * 3.33)))
+        self.dt = (self.dt.replace(hour=self._molad_hours, minute=self._molad_minutes,
+                                   second=self._molad_chalakim * 10 // 3))
 
     @property
     def molad_hours(self):
@@ -351,8 +740,9 @@ class JewishDate(object):
 
     def set_date(self, datetime):
         """Sets the date based on datetime object. Modifies the Jewish date as well."""
-        self.dt = datetime
-        self._jyear, self._jmonth, self._jday = datetimeToJewishDate(datetime)
+        self._dt = datetime
+        self._ordinal = datetime.toordinal()
+        self._jyear = self._jmonth = self._jday = None
 
     def set_gdate(self, year=None, month=None, day=None, hour=0,
                   minute=0, second=0, microsecond=0):
@@ -385,8 +775,8 @@ class JewishDate(object):
         self._molad_minutes = minutes
         self._molad_chalakim = chalakim
 
-        abs_date = jdate_to_abs_date(year, month, day) # reset Gregorian date
-        self.dt = datetime.fromordinal(abs_date)
+        self._ordinal = jdate_to_abs_date(year, month, day) # reset Gregorian date
+        self._dt = None
         self._jyear = year
         self._jmonth = month
         self._jday = day
@@ -400,28 +790,28 @@ class JewishDate(object):
         """Returns a string containing the Jewish date in the form, "day Month, year"
         e.g. "21 Shevat, 5729". For more complex formatting, use the formatter classes.
         """
-        from .HebrewDateFormatter import HebrewDateFormatter
-        return HebrewDateFormatter().format_date(self)
+        return _get_formatter().format_date(self)
 
     def format(self, format_string):
-        from .HebrewDateFormatter import HebrewDateFormatter
-        return HebrewDateFormatter().format(self, format_string)
+        return _get_formatter().format(self, format_string)
 
     def strftime(self, format_string):
-        from .HebrewDateFormatter import HebrewDateFormatter
-        return HebrewDateFormatter().format(self, format_string)
+        return _get_formatter().format(self, format_string)
 
     @property
     def heb_string(self):
         """Returns a string containing the Jewish date in the form, "day Month, year"
         e.g. "21 Shevat, 5729". For more complex formatting, use the formatter classes.
         """
-        from .HebrewDateFormatter import HebrewDateFormatter
-        return HebrewDateFormatter(hebrew=True).format_date(self)
+        return _get_formatter(True).format_date(self)
 
     def forward(self):
         """Rolls Date forward 1 day"""
-        self.dt += timedelta(days=1)
+        self._ordinal += 1
+        if self._dt is not None:
+            self._dt += timedelta(days=1)
+        if self._jyear is None: # the Jewish date wasn't calculated yet
+            return
         if self._jday < 29:
             self._jday += 1
         elif self._jday == get_days_in_jmonth(self._jmonth, self._jyear):
@@ -445,7 +835,11 @@ class JewishDate(object):
 
     def back(self):
         """Rolls Date back 1 day"""
-        self.dt -= timedelta(days=1)
+        self._ordinal -= 1
+        if self._dt is not None:
+            self._dt -= timedelta(days=1)
+        if self._jyear is None: # the Jewish date wasn't calculated yet
+            return
         if self._jday > 1:
             self._jday -= 1
         else:
@@ -461,6 +855,25 @@ class JewishDate(object):
                 self._jmonth -= 1
             self._jday = get_days_in_jmonth(self._jmonth, self._jyear)
 
+    def _calculate_jdate(self):
+        """Calculates the Jewish year, month and day from the absolute date"""
+        self._jyear, self._jmonth, self._jday = abs_date_to_jdate(self._ordinal)
+
+    @property
+    def dt(self):
+        """Gregorian datetime"""
+        if self._dt is None:
+            self._dt = datetime.fromordinal(self._ordinal)
+        return self._dt
+
+    @dt.setter
+    def dt(self, value):
+        ordinal = value.toordinal()
+        if ordinal != self._ordinal:
+            self._ordinal = ordinal
+            self._jyear = self._jmonth = self._jday = None
+        self._dt = value
+
     @property
     def gyear(self):
         """Gregorian Year"""
@@ -479,35 +892,39 @@ class JewishDate(object):
     @property
     def jyear(self):
         """Jewish Year"""
+        if self._jyear is None:
+            self._calculate_jdate()
         return self._jyear
 
     @property
     def jmonth(self):
         """Jewish Month - Nissan = 1, Adar II = 13"""
+        if self._jyear is None:
+            self._calculate_jdate()
         return self._jmonth
 
     @property
     def jday(self):
         """Jewish Day"""
+        if self._jyear is None:
+            self._calculate_jdate()
         return self._jday
 
     @property
     def dayofweek(self):
         """Day of the week as a number between Sunday=1, Saturday=7."""
-        if self.dt.isoweekday() == 7:
-            return 1
-        return self.dt.isoweekday() + 1
+        return self._ordinal % 7 + 1 # ordinal 1 (1/1/1) is a Monday
 
     def get_days_in_month(self):
-        return get_days_in_jmonth(self._jyear, self._jmonth)
+        return get_days_in_jmonth(self.jmonth, self.jyear)
 
     def isoweekday(self):
         """Return the day of the week as a number between Monday=1, Sunday=7."""
-        return self.dt.isoweekday()
+        return (self._ordinal - 1) % 7 + 1
 
     def weekday(self):
         """Return datetime.weekday()"""
-        return self.dt.weekday()
+        return (self._ordinal - 1) % 7
 
     def greplace(self, year=None, month=None, day=None, hour=None,
                  minute=None, second=None, microsecond=None, tzinfo=True):
@@ -522,13 +939,105 @@ class JewishDate(object):
         jday -- the day of the month
         """
         if not jyear:
-            jyear = self._jyear
+            jyear = self.jyear
         if not jmonth:
-            jmonth = self._jmonth
+            jmonth = self.jmonth
         if not jday:
-            jday = self._jday
+            jday = self.jday
         return JewishDate(jyear, jmonth, jday)
 
+    def freeze(self):
+        """Returns a FrozenJewishDate of this date"""
+        return FrozenJewishDate.fromordinal(self._ordinal)
+
+    def add_months(self, months):
+        """Returns a new date the given number of months later (earlier if negative), see
+        add_jmonths. A day that doesn't exist in the new month (30 Cheshvan, Kislev or Adar I)
+        becomes its last day. Like jreplace, the time of day isn't kept.
+        """
+        jyear, jmonth = add_jmonths(self.jyear, self.jmonth, months)
+        return self._with_jdate(jyear, jmonth, self.jday)
+
+    def add_years(self, years):
+        """Returns a new date on the same day and month the given number of years later (earlier
+        if negative). Adar of a leap year (Adar I) and Adar II become Adar on a regular year, Adar
+        of a regular year becomes Adar II on a leap year. A day that doesn't exist in the new year
+        (30 Cheshvan, Kislev or Adar I) becomes the last day of the month.
+        """
+        jyear = self.jyear + years
+        jmonth = self.jmonth
+        if jmonth == ADAR_II and not is_jyear_leap(jyear):
+            jmonth = ADAR
+        elif jmonth == ADAR and not self.is_jyear_leap() and is_jyear_leap(jyear):
+            jmonth = ADAR_II
+        return self._with_jdate(jyear, jmonth, self.jday)
+
+    def _with_jdate(self, jyear, jmonth, jday):
+        """Returns a copy set to the Jewish date, with the day limited to the days in the month"""
+        new = self.copy()
+        new.set_jdate(jyear, jmonth, min(jday, get_days_in_jmonth(jmonth, jyear)))
+        return new
+
+    def __add__(self, other):
+        """Returns a new date moved by a timedelta"""
+        if not isinstance(other, timedelta):
+            return NotImplemented
+        new = self.copy()
+        if other.seconds or other.microseconds or self._dt is not None:
+            new.set_date(self.dt + other)
+        else:
+            new.fromordinal(self._ordinal + other.days)
+        return new
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        """Returns a new date for date - timedelta and the number of days between the dates for
+        date - date
+        """
+        if isinstance(other, timedelta):
+            return self + -other
+        if isinstance(other, (JewishDate, FrozenJewishDate)):
+            return self._ordinal - other.toordinal()
+        return NotImplemented
+
+    def copy(self):
+        """Returns a new instance with the same date"""
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        return new
+
+    __copy__ = copy
+
+    @classmethod
+    def range(cls, start, stop, step=1, cursor=False):
+        """Generates the dates from start up to, but not including, stop. Like the builtin range
+        a negative step goes back in time.
+
+        Arguments:
+        start, stop -- JewishDate, FrozenJewishDate, date or datetime. Only the date is used
+        step -- number of days between dates (Default 1)
+        cursor -- if True the same instance is yielded every time, moved along with forward()
+        or back(). It must not be kept past the next iteration. Otherwise a copy is yielded.
+        """
+        return cls._iterate(cls(*abs_date_to_jdate(start.toordinal())), stop, step, cursor)
+
+    @staticmethod
+    def _iterate(current, stop, step, cursor):
+        """Generator used by range. Rolls current from its date to stop step days at a time.
+        current should be set by Jewish date, so forward() and back() only have to update the
+        Jewish fields and the datetime is only created if it is used.
+        """
+        if not step:
+            raise ValueError("range() step can't be 0")
+        stop = stop.toordinal()
+        move = current.forward if step > 0 else current.back
+        days = abs(step)
+        while current._ordinal < stop if step > 0 else current._ordinal > stop:
+            yield current if cursor else current.copy()
+            for _ in range(days):
+                move()
+
 SAT_SHORT = [None, 52, None, None, 0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16,
              17, 18, 19, 20, 53, 23, 24, None, 25, 54, 55, 30, 56, 33, 34, 35, 36, 37, 38, 39,
              40, 58, 43, 44, 45, 46, 47, 48, 49, 50]
@@ -756,6 +1265,328 @@ YOM_YERUSHALAYIM = 32
 LAG_BAOMER = 33
 DAF_YOMI_START_DATE = datetime(1923, 9, 11)
 SHEKALIM_CHANGE_DATE = datetime(1975, 6, 24)
+# The number of blatt per masechta. Shekalim (masechta 4) changed from 13 to 22 blatt on the
+# 8th Daf Yomi cycle beginning on June 24, 1975.
+BLATT_PER_MASECHTA = (64, 157, 105, 121, 22, 88, 56, 40, 35, 31, 32, 29, 27, 122, 112,
+                      91, 66, 49, 90, 82, 119, 119, 176, 113, 24, 49, 76, 14, 120, 110,
+                      142, 61, 34, 34, 28, 22, 4, 10, 4, 73)
+# Kinnim, Tamid and Midos don't start at daf 2, their first daf in the cycle is moved up
+DAF_YOMI_BLATT_OFFSETS = (0,) * 36 + (21, 24, 33, 0)
+
+DafYomiCycle = namedtuple('DafYomiCycle', 'start days first_cycle masechta_starts blatt_offsets')
+
+def _build_daf_yomi_cycle(start, shekalim_blatt, first_cycle):
+    """Returns the DafYomiCycle for the cycles from start, with the day in the cycle that every
+    masechta starts on. The first daf learned of a masechta is daf 2.
+    """
+    blatt_per_masechta = list(BLATT_PER_MASECHTA)
+    blatt_per_masechta[4] = shekalim_blatt
+    masechta_starts = []
+    total = 0
+    for blatt in blatt_per_masechta:
+        masechta_starts.append(total)
+        total += blatt - 1
+    # the offsets are added to the day in the cycle, so the daf can be found by subtracting the
+    # start day of the masechta
+    blatt_offsets = tuple(2 + offset - masechta_start for offset, masechta_start
+                          in zip(DAF_YOMI_BLATT_OFFSETS, masechta_starts))
+    return DafYomiCycle(start.toordinal(), total, first_cycle, tuple(masechta_starts),
+                        blatt_offsets)
+
+DAF_YOMI_CYCLES = (_build_daf_yomi_cycle(DAF_YOMI_START_DATE, 13, 1),
+                   _build_daf_yomi_cycle(SHEKALIM_CHANGE_DATE, 22, 8))
+
+def _get_daf_yomi_cycle(abs_date):
+    """Returns the DafYomiCycle used on an absolute date or None before the first cycle"""
+    if abs_date >= DAF_YOMI_CYCLES[1].start:
+        return DAF_YOMI_CYCLES[1]
+    if abs_date >= DAF_YOMI_CYCLES[0].start:
+        return DAF_YOMI_CYCLES[0]
+    return None
+
+def get_daf_yomi_bavli(abs_date):
+    """Returns a tuple of masechta number and daf of the Daf Yomi on an absolute date (Gregorian
+    ordinal), or None before the first cycle on DAF_YOMI_START_DATE
+    """
+    cycle = _get_daf_yomi_cycle(abs_date)
+    if cycle is None:
+        return None
+    day = (abs_date - cycle.start) % cycle.days
+    masechta = bisect_right(cycle.masechta_starts, day) - 1
+    return masechta, day + cycle.blatt_offsets[masechta]
+
+def get_daf_yomi_bavli_range(start, stop):
+    """Generates the Daf Yomi of every absolute date from start up to (not including) stop, as
+    the tuples returned by get_daf_yomi_bavli. Following days are filled in masechta by masechta
+    without looking up every day.
+    """
+    abs_date = start
+    while abs_date < stop:
+        cycle = _get_daf_yomi_cycle(abs_date)
+        if cycle is None:
+            yield None
+            abs_date += 1
+            continue
+        # the cycle layout is used until the next layout starts
+        segment_stop = stop
+        if cycle is DAF_YOMI_CYCLES[0]:
+            segment_stop = min(stop, DAF_YOMI_CYCLES[1].start)
+        day = (abs_date - cycle.start) % cycle.days
+        masechta = bisect_right(cycle.masechta_starts, day) - 1
+        masechtos = len(cycle.masechta_starts)
+        while abs_date < segment_stop:
+            if masechta + 1 < masechtos:
+                masechta_end = cycle.masechta_starts[masechta + 1]
+            else:
+                masechta_end = cycle.days
+            count = min(masechta_end - day, segment_stop - abs_date)
+            offset = cycle.blatt_offsets[masechta]
+            for blatt in range(day + offset, day + offset + count):
+                yield masechta, blatt
+            abs_date += count
+            day += count
+            if day == masechta_end:
+                masechta += 1
+                if masechta == masechtos: # a new cycle
+                    masechta = 0
+                    day = 0
+
+def _get_yom_tov_index(jmonth, jday, dayofweek, leap, kislev_short, in_israel,
+                       use_modern_holidays):
+    """Returns the holiday index of a day or None, from the holiday tables and rules"""
+    if not in_israel:
+        index = HOLIDAYS_DIASPORA.get((jmonth, jday), None)
+    else:
+        index = HOLIDAYS_ISRAEL.get((jmonth, jday), None)
+    index = FAST_DAYS_NIDCHE.get((jmonth, jday, dayofweek), index)
+    # "not index" drops EREV_PESACH (0), so Erev Pesach has no holiday index. It is kept for
+    # compatibility, get_day_info adds it to its columns.
+    if not index:
+        index = FAST_DAYS_NORMAL.get((jmonth, jday), None)
+    if use_modern_holidays:
+        index = MODERN_HOLIDAYS.get((jmonth, jday, dayofweek), index)
+    if not index:
+        if jmonth == TEVES:
+            if kislev_short and jday == 3:
+                index = CHANUKAH
+        if jmonth == ADAR and not leap:
+            if (jday == 11 or jday == 12 and dayofweek == 5
+                    or jday == 13 and dayofweek < 6):
+                index = FAST_OF_ESTHER
+            if jday == 14:
+                index = PURIM
+            if jday == 15:
+                index = SHUSHAN_PURIM
+        elif jmonth == ADAR and leap:
+            if jday == 14:
+                index = PURIM_KATAN
+        if not index: # still not a holiday
+            return None  # no Yom Tov
+    return index
+
+YearTemplate = namedtuple('YearTemplate', ['holidays', 'parshiyos', 'first_shabbos', 'weeks'])
+YearTemplate.__doc__ = """Holidays and parshiyos of a type of Jewish year. Days are counted from
+Rosh Hashana.
+
+holidays -- the holiday index of every day or None
+parshiyos -- the parsha index of every Shabbos, None for the other days and a Shabbos without
+a parsha
+first_shabbos -- the day of the first Shabbos on or after Rosh Hashana
+weeks -- the parsha index (or None) of every Shabbos of the year, starting with first_shabbos
+"""
+
+_year_templates = {}
+
+def get_year_template(rosh_hashana_dayofweek, kviah, leap, in_israel=False,
+                      use_modern_holidays=False):
+    """Returns the YearTemplate of a year type. The holidays and parshiyos of a Jewish year only
+    depend on the day of week of Rosh Hashana, the kviah and whether it is a leap year, so
+    every template is only built once.
+    """
+    key = (rosh_hashana_dayofweek, kviah, leap, in_israel, use_modern_holidays)
+    template = _year_templates.get(key)
+    if template is None:
+        template = _year_templates[key] = _build_year_template(*key)
+    return template
+
+def get_jyear_template(year, in_israel=False, use_modern_holidays=False):
+    """Returns the YearTemplate of a Jewish year. Index it by days since Rosh Hashana, which is
+    get_jyear_info(year).rosh_hashana.
+    """
+    info = get_jyear_info(year)
+    return get_year_template(info.rosh_hashana % 7 + 1, info.kviah, info.leap, in_israel,
+                             use_modern_holidays)
+
+def _build_year_template(rosh_hashana_dayofweek, kviah, leap, in_israel, use_modern_holidays):
+    """Evaluates the holiday and parsha rules for every day of a year type"""
+    if in_israel:
+        parsha_array = PARSHA_ARRAY_ISRAEL.get((rosh_hashana_dayofweek, kviah, leap), None)
+    else:
+        parsha_array = PARSHA_ARRAY_DIASPORA.get((rosh_hashana_dayofweek, kviah, leap), None)
+    if not parsha_array:
+        raise ValueError("""Unable to calculate the parsha. No index array matched any of the
+                         known types for the year type: %s, %s, %s"""
+                         % (rosh_hashana_dayofweek, kviah, leap))
+    month_lengths = [0, 30, 29, 30, 29, 30, 29, 30, 29, 30, 29, 30, 30 if leap else 29, 29]
+    if kviah == SHELAIMIM:
+        month_lengths[CHESHVAN] = 30
+    elif kviah == CHASERIM:
+        month_lengths[KISLEV] = 29
+    holidays = []
+    parshiyos = []
+    offset = 0
+    for jmonth in LEAP_YEAR_MONTHS if leap else YEAR_MONTHS:
+        for jday in range(1, month_lengths[jmonth] + 1):
+            dayofweek = (rosh_hashana_dayofweek + offset - 1) % 7 + 1
+            holidays.append(_get_yom_tov_index(jmonth, jday, dayofweek, leap, kviah == CHASERIM,
+                                               in_israel, use_modern_holidays))
+            if dayofweek == 7:
+                # the week since the first Shabbos on or after Rosh Hashana
+                parshiyos.append(parsha_array[(offset - (7 - rosh_hashana_dayofweek)) // 7])
+            else:
+                parshiyos.append(None)
+            offset += 1
+    first_shabbos = 7 - rosh_hashana_dayofweek
+    return YearTemplate(tuple(holidays), tuple(parshiyos), first_shabbos,
+                        tuple(parshiyos[first_shabbos::7]))
+
+def get_upcoming_parsha(abs_date, in_israel=False):
+    """Returns a tuple of (absolute date, parsha index) of the first Shabbos on or after the
+    absolute date that has a parsha. A Shabbos that is Yom Tov is skipped.
+    """
+    shabbos = abs_date + 6 - abs_date % 7 # ordinal % 7 == 6 on Shabbos
+    jyear = abs_date_to_jdate(shabbos)[0]
+    while True:
+        info = get_jyear_info(jyear)
+        template = get_year_template(info.rosh_hashana % 7 + 1, info.kviah, info.leap, in_israel)
+        week = (shabbos - info.rosh_hashana - template.first_shabbos) // 7
+        if week >= len(template.weeks):
+            jyear += 1
+        elif template.weeks[week] is not None:
+            return (shabbos, template.weeks[week])
+        else:
+            shabbos += 7
+
+def get_parshiyos(start, stop, in_israel=False):
+    """Returns a list of (absolute date, parsha index) for every Shabbos from the absolute date
+    start up to, but not including, stop. The parsha index is None for a Shabbos that is Yom Tov.
+    """
+    parshiyos = []
+    shabbos = start + (6 - start % 7) % 7 # ordinal % 7 == 6 on Shabbos
+    jyear = abs_date_to_jdate(shabbos)[0] if shabbos < stop else None
+    while shabbos < stop:
+        info = get_jyear_info(jyear)
+        template = get_year_template(info.rosh_hashana % 7 + 1, info.kviah, info.leap, in_israel)
+        first = info.rosh_hashana + template.first_shabbos
+        for week in range((shabbos - first) // 7, len(template.weeks)):
+            if shabbos >= stop:
+                break
+            parshiyos.append((shabbos, template.weeks[week]))
+            shabbos += 7
+        jyear += 1
+    return parshiyos
+
+DayInfo = namedtuple('DayInfo', ['ordinals', 'jyears', 'jmonths', 'jdays', 'dayofweek',
+                                 'yom_tov_index', 'is_yom_tov', 'is_chol_hamoed',
+                                 'is_erev_yom_tov', 'is_taanis', 'is_rosh_chodesh',
+                                 'day_of_chanukah', 'day_of_omer', 'parsha_index',
+                                 'daf_yomi_masechta', 'daf_yomi_daf'])
+DayInfo.__doc__ = """Columns returned by get_day_info, one array.array per field with a value
+for every day. The values are those of the JewishCalendar methods of the same names, with -1
+instead of None for the indexes (yom tov, parsha and the masechta) and 0 instead of None for the
+day of Chanukah or the Omer and the daf. Flags are 0 or 1 and dayofweek is Sunday = 1.
+
+Unlike the JewishCalendar methods, Erev Pesach has the yom tov index EREV_PESACH and is an erev
+yom tov, and is_yom_tov is 1 on the days with a holiday index other than an erev, Chanukah or a
+fast (except Yom Kippur).
+"""
+
+_day_info_templates = {}
+
+def _get_day_info_template(rosh_hashana_dayofweek, kviah, leap, in_israel, use_modern_holidays):
+    """Returns the DayInfo columns from jmonths to parsha_index for every day of a year type.
+    Like the YearTemplate they are only built once.
+    """
+    key = (rosh_hashana_dayofweek, kviah, leap, in_israel, use_modern_holidays)
+    columns = _day_info_templates.get(key)
+    if columns is not None:
+        return columns
+    holidays = get_year_template(*key).holidays
+    parshiyos = get_year_template(rosh_hashana_dayofweek, kviah, leap, in_israel).parshiyos
+    month_lengths = _get_year_layout(YEAR_LENGTHS[kviah + 3 * leap])[1]
+    columns = DayInfo(*[array('b') for _ in DayInfo._fields]) # ordinals, years and daf unused
+    offset = 0
+    for jmonth in LEAP_YEAR_MONTHS if leap else YEAR_MONTHS:
+        for jday in range(1, month_lengths[jmonth] + 1):
+            index = holidays[offset]
+            if jmonth == NISSAN and jday == 14: # _get_yom_tov_index has None
+                index = EREV_PESACH
+            taanis = index in (SEVENTEEN_OF_TAMMUZ, TISHA_BEAV, YOM_KIPPUR, FAST_OF_GEDALYAH,
+                               TENTH_OF_TEVES, FAST_OF_ESTHER)
+            erev = index in (EREV_PESACH, EREV_SHAVUOS, EREV_ROSH_HASHANA, EREV_YOM_KIPPUR,
+                             EREV_SUCCOS)
+            if index != CHANUKAH:
+                chanukah = 0
+            elif jmonth == KISLEV:
+                chanukah = jday - 24
+            else: # Teves
+                chanukah = jday + (5 if kviah == CHASERIM else 6)
+            if jmonth == NISSAN and jday >= 16:
+                omer = jday - 15
+            elif jmonth == IYAR:
+                omer = jday + 15
+            elif jmonth == SIVAN and jday < 6:
+                omer = jday + 44
+            else:
+                omer = 0
+            columns.jmonths.append(jmonth)
+            columns.jdays.append(jday)
+            columns.dayofweek.append((rosh_hashana_dayofweek + offset - 1) % 7 + 1)
+            columns.yom_tov_index.append(-1 if index is None else index)
+            columns.is_yom_tov.append(not (index is None or erev or index == CHANUKAH
+                                           or (taanis and index != YOM_KIPPUR)))
+            columns.is_chol_hamoed.append(index in (CHOL_HAMOED_PESACH, CHOL_HAMOED_SUCCOS))
+            columns.is_erev_yom_tov.append(erev)
+            columns.is_taanis.append(taanis)
+            columns.is_rosh_chodesh.append(jday == 1 and jmonth != TISHREI or jday == 30)
+            columns.day_of_chanukah.append(chanukah)
+            columns.day_of_omer.append(omer)
+            columns.parsha_index.append(-1 if parshiyos[offset] is None else parshiyos[offset])
+            offset += 1
+    _day_info_templates[key] = columns
+    return columns
+
+def get_day_info(start, stop, in_israel=False, use_modern_holidays=False):
+    """Returns the DayInfo columns of every day from the absolute date start up to (not
+    including) stop. Every Jewish year in the range is copied from the columns of its year type
+    and the Daf Yomi comes from get_daf_yomi_bavli_range, so no JewishCalendar is created.
+    """
+    info_columns = DayInfo(*([array('i'), array('i')] + [array('b') for _ in range(13)]
+                             + [array('h')]))
+    if start >= stop:
+        return info_columns
+    info_columns.ordinals.extend(range(start, stop))
+    abs_date = start
+    jyear = abs_date_to_jdate(start)[0]
+    while abs_date < stop:
+        info = get_jyear_info(jyear)
+        columns = _get_day_info_template(info.rosh_hashana % 7 + 1, info.kviah, info.leap,
+                                         in_israel, use_modern_holidays)
+        first = abs_date - info.rosh_hashana
+        last = min(stop - info.rosh_hashana, info.days)
+        info_columns.jyears.extend(array('i', [jyear]) * (last - first))
+        for name in DayInfo._fields[2:-2]:
+            getattr(info_columns, name).extend(getattr(columns, name)[first:last])
+        abs_date = info.rosh_hashana + last
+        jyear += 1
+    for daf_yomi in get_daf_yomi_bavli_range(start, stop):
+        if daf_yomi is None:
+            info_columns.daf_yomi_masechta.append(-1)
+            info_columns.daf_yomi_daf.append(0)
+        else:
+            info_columns.daf_yomi_masechta.append(daf_yomi[0])
+            info_columns.daf_yomi_daf.append(daf_yomi[1])
+    return info_columns
 
 
 class JewishCalendar(JewishDate):
@@ -784,7 +1615,6 @@ class JewishCalendar(JewishDate):
     * Shabbos Mevarchim
     * Haftorah (various minhagim)
     * Daf Yomi Yerushalmi, Mishna yomis etc)
-    * Support showing the upcoming parsha for the middle of the week
 
     Author: Avrom Finkelstien 2002
     Author: Eliyahu Hershfeld 2011 - 2012
@@ -830,88 +1660,32 @@ class JewishCalendar(JewishDate):
 
     in_israel = False
     use_modern_holidays = False
-    holiday_index = None
-    not_holiday = False  # only for optimization - will not always be correct
 
-    def __init__(self, date=datetime.now(), jmonth=None, jday=None, inisrael=False):
+    def __init__(self, date=None, jmonth=None, jday=None, inisrael=False):
+        if date is None: # evaluated per call, not once when the module is imported
+            date = datetime.now()
         super(JewishCalendar, self).__init__(date, jmonth, jday)
         self.in_israel = inisrael
-        self.not_holiday = False
-        self.holiday_index = None
 
     @classmethod
     def now(cls):
         """Creates Jewish Calendar set to current system time"""
         return JewishCalendar(datetime.now())
 
-    def set_jdate_by_molad(self, molad):
-        super(JewishCalendar, self).set_jdate_by_molad(molad)
-        self.not_holiday = False
-        self.holiday_index = None
-
-    def set_date(self, dt):
-        super(JewishCalendar, self).set_date(dt)
-        self.not_holiday = False
-        self.holiday_index = None
-
-    def set_gdate(self, year=None, month=None, day=None, hour=0,
-                  minute=0, second=0, microsecond=0):
-        super(JewishCalendar, self).set_gdate(year, month, day, hour,
-                                              minute, second, microsecond)
-        self.not_holiday = False
-        self.holiday_index = None
-
-    def set_jdate(self, year, month, day, hours=None, minutes=None, chalakim=None):
-        super(JewishCalendar, self).set_jdate(
-            year, month, day, hours, minutes, chalakim)
-        self.not_holiday = False
-        self.holiday_index = None
-
-    def forward(self):
-        super(JewishCalendar, self).forward()
-        self.not_holiday = False
-        self.holiday_index = None
-
-    def back(self):
-        super(JewishCalendar, self).back()
-        self.not_holiday = False
-        self.holiday_index = None
+    @classmethod
+    def range(cls, start, stop, step=1, cursor=False, inisrael=False):
+        """Generates the dates from start up to, but not including, stop.
+        See JewishDate.range, inisrael is passed to every JewishCalendar.
+        """
+        jyear, jmonth, jday = abs_date_to_jdate(start.toordinal())
+        return cls._iterate(cls(jyear, jmonth, jday, inisrael=inisrael), stop, step, cursor)
 
     def get_yom_tov_index(self):
         """Return an index if current day is a Jewish holiday/fast day, or None if not"""
-        if self.not_holiday:
-            return None
-        if self.holiday_index:
-            return self.holiday_index
-        if not self.in_israel:
-            index = HOLIDAYS_DIASPORA.get((self.jmonth, self.jday), None)
-        else:
-            index = HOLIDAYS_ISRAEL.get((self.jmonth, self.jday), None)
-        index = FAST_DAYS_NIDCHE.get((self.jmonth, self.jday, self.dayofweek), index)
-        if not index:  # can probably be made into one line
-            index = FAST_DAYS_NORMAL.get((self.jmonth, self.jday), None)
-        if self.use_modern_holidays:
-            index = MODERN_HOLIDAYS.get((self.jmonth, self.jday, self.dayofweek), index)
-        if not index:
-            if self.jmonth == TEVES:
-                if self.is_kislev_short() and self.jday == 3:
-                    index = CHANUKAH
-            if self.jmonth == ADAR and not self.is_jyear_leap():
-                if (self.jday == 11 or self.jday == 12 and self.dayofweek == 5
-                        or self.jday == 13 and self.dayofweek < 6):
-                    index = FAST_OF_ESTHER
-                if self.jday == 14:
-                    index = PURIM
-                if self.jday == 15:
-                    index = SHUSHAN_PURIM
-            elif self.jmonth == ADAR and self.is_jyear_leap():
-                if self.jday == 14:
-                    index = PURIM_KATAN
-            if not index: # still not a holiday
-                self.not_holiday = True
-                return None  # no Yom Tov
-        self.holiday_index = index
-        return index
+        info = get_jyear_info(self.jyear)
+        template = get_year_template(info.rosh_hashana % 7 + 1, info.kviah, info.leap,
+                                     self.in_israel, self.use_modern_holidays)
+        return template.holidays[self._ordinal - info.rosh_hashana]
 
     def is_yom_tov(self):
         """Return true if current day is Yom Tov. False for Chanukah, Erev Yom tov and fast days."""
@@ -963,30 +1737,20 @@ class JewishCalendar(JewishDate):
         """Return a the index of today's parsha(ios) or a -1 if there is none. To get the
         name of the Parsha, use the HebrewDateFormatter
 
-        NOTE: This only returns the parsha for Shabbos - not the upcoming shabbos's parsha
+        NOTE: This only returns the parsha for Shabbos, use get_upcoming_parsha_index for the
+        upcoming shabbos's parsha
         """
-        # if today is not Shabbos, then there is no normal parsha reading. If
-        # commented our will return LAST week's parsha for a non shabbos
-        if self.dayofweek != 7:
-            return None
-        # kvia = whether a Jewish year is short/regular/long (0/1/2)
-        # rosh_hashana = Rosh Hashana of this Jewish year
-        # rh_day= day of week Rosh Hashana was on this year
-        # week= current week in Jewish calendar from Rosh Hashana
-        kvia = self.get_cheshvan_kislev_kviah()
-        rosh_hashana = JewishDate(self.jyear, TISHREI, 1) # set it to Rosh Hashana of this year
-        rh_day = rosh_hashana.dayofweek
-        # week is the week since the first Shabbos on or after Rosh Hashana
-        week = int(((self.dt.toordinal() - rosh_hashana.dt.toordinal()) - (7 - rh_day)) / 7)
-        # determine appropriate array
-        if self.in_israel:
-            array = PARSHA_ARRAY_ISRAEL.get((rh_day, kvia, self.is_jyear_leap()), None)
-        else:
-            array = PARSHA_ARRAY_DIASPORA.get((rh_day, kvia, self.is_jyear_leap()), None)
-        if not array:
-            raise ValueError("""Unable to calculate the parsha. No index array matched any of the
-                             known types for the date: """ + str(self))
-        return array[week]
+        info = get_jyear_info(self.jyear)
+        template = get_year_template(info.rosh_hashana % 7 + 1, info.kviah, info.leap,
+                                     self.in_israel)
+        return template.parshiyos[self._ordinal - info.rosh_hashana]
+
+    def get_upcoming_parsha_index(self):
+        """Return the index of the parsha of the upcoming Shabbos, or today's parsha on Shabbos.
+        If that Shabbos is Yom Tov without a parsha, the parsha of the following Shabbos is
+        returned.
+        """
+        return get_upcoming_parsha(self._ordinal, self.in_israel)[1]
 
     def is_rosh_chodesh(self):
         """Return True if the day is Rosh Chodesh. Rosh Hashana will return False"""
@@ -1008,45 +1772,128 @@ class JewishCalendar(JewishDate):
 
     def get_daf_yomi_bavli(self):
         """Return tuple of Mesechta number and Daf of the days Daf Yomi"""
-        #The number of daf per masechta. Since the number of blatt in Shekalim changed on the 8th
-        # Daf Yomi cycle beginning on June 24, 1975 from 13 to 22, the actual calculation for
-        # blattPerMasechta[4] will later be adjusted based on the cycle.
-        blatt_per_masechta = [64, 157, 105, 121, 22, 88, 56, 40, 35, 31, 32, 29, 27, 122, 112,
-                              91, 66, 49, 90, 82, 119, 119, 176, 113, 24, 49, 76, 14, 120, 110,
-                              142, 61, 34, 34, 28, 22, 4, 10, 4, 73]
-        date = self.dt
-        cycle_num = 0
-        daf_num = 0
-        if date < DAF_YOMI_START_DATE:
-            # TODO: should we return a null or throw an IllegalArgumentException?
-            return None
-            # raise IllegalArgumentException(date +
-            #    " is prior to organized Daf Yomi Bavli cycles that started on "
-            #        + DAF_YOMI_START_DATE)
-        if date >= SHEKALIM_CHANGE_DATE:
-            cycle_num, daf_num = divmod(date.toordinal() - datetime(1975, 6, 24).toordinal(), 2711)
-            cycle_num += 8
-        else:
-            cycle_num, daf_num = divmod(date.toordinal() - datetime(1923, 9, 11).toordinal(), 2702)
-            cycle_num += 1
-        total = 0
-        masechta = -1
-        blatt = 0
-
-        if cycle_num <= 7: # Fix Shekalim for old cycles.
-            blatt_per_masechta[4] = 13
+        return get_daf_yomi_bavli(self._ordinal)
+
+
+@total_ordering
+class FrozenJewishDate(object):
+    """An immutable Jewish date that only holds its absolute date (Gregorian ordinal).
+    Arguments are the same as for JewishDate: a date/datetime or a Jewish year, month and day.
+
+    Frozen dates compare and hash by their ordinal, so they can be used as dict keys, in sets
+    and with bisect. The Jewish and Gregorian fields are calculated when used. Convert with
+    to_jewish_date / to_jewish_calendar and JewishDate.freeze().
+    """
+    __slots__ = ('_ordinal',)
+
+    def __init__(self, jyear, jmonth=None, jday=None):
+        if isinstance(jyear, date): # datetime is a subclass of date
+            ordinal = jyear.toordinal()
         else:
-            blatt_per_masechta[4] = 22
-        for j in range(0, len(blatt_per_masechta)): # Finally find the daf.
-            masechta += 1 #why is this necesar - isnt it the same as j
-            total = total + blatt_per_masechta[j] - 1
-            if daf_num < total:
-                blatt = 1 + blatt_per_masechta[j] - (total - daf_num)
-                # Fiddle with the weird ones near the end.
-                if masechta == 36:
-                    blatt += 21
-                elif masechta == 37:
-                    blatt += 24
-                elif masechta == 38:
-                    blatt += 33
-                return masechta, blatt
+            validateJewishDate(jyear, jmonth, jday)
+            ordinal = jdate_to_abs_date(jyear, jmonth, jday)
+        object.__setattr__(self, '_ordinal', ordinal)
+
+    @classmethod
+    def fromordinal(cls, abs_date):
+        """Creates a FrozenJewishDate from an absolute date (Gregorian ordinal)"""
+        frozen = cls.__new__(cls)
+        object.__setattr__(frozen, '_ordinal', abs_date)
+        return frozen
+
+    @classmethod
+    def from_jewish_date(cls, jewishdate):
+        """Creates a FrozenJewishDate from a JewishDate or JewishCalendar"""
+        return cls.fromordinal(jewishdate.toordinal())
+
+    def to_jewish_date(self):
+        """Returns a new (mutable) JewishDate"""
+        return JewishDate(datetime.fromordinal(self._ordinal))
+
+    def to_jewish_calendar(self, inisrael=False):
+        """Returns a new (mutable) JewishCalendar"""
+        return JewishCalendar(datetime.fromordinal(self._ordinal), inisrael=inisrael)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FrozenJewishDate is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("FrozenJewishDate is immutable")
+
+    def __reduce__(self):
+        return (self.__class__.fromordinal, (self._ordinal,))
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenJewishDate):
+            return self._ordinal == other._ordinal
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, FrozenJewishDate):
+            return self._ordinal != other._ordinal
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, FrozenJewishDate):
+            return self._ordinal < other._ordinal
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._ordinal)
+
+    def __add__(self, other):
+        """Returns a new date moved by the days of a timedelta"""
+        if not isinstance(other, timedelta):
+            return NotImplemented
+        return self.fromordinal(self._ordinal + other.days)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        """Returns a new date for date - timedelta and the number of days between the dates for
+        date - date
+        """
+        if isinstance(other, timedelta):
+            return self.fromordinal(self._ordinal - other.days)
+        if isinstance(other, (JewishDate, FrozenJewishDate)):
+            return self._ordinal - other.toordinal()
+        return NotImplemented
+
+    def __repr__(self):
+        return "%s(%s, %s, %s)" % ((self.__class__.__name__,) + self.jdate)
+
+    def __str__(self):
+        return str(self.to_jewish_date())
+
+    def toordinal(self):
+        """Returns the absolute date (days since January 1, 0001 on the Gregorian calendar)."""
+        return self._ordinal
+
+    def todate(self):
+        """Returns the Gregorian date"""
+        return date.fromordinal(self._ordinal)
+
+    @property
+    def jdate(self):
+        """Tuple of (jyear, jmonth, jday)"""
+        return abs_date_to_jdate(self._ordinal)
+
+    @property
+    def jyear(self):
+        """Jewish Year"""
+        return abs_date_to_jdate(self._ordinal)[0]
+
+    @property
+    def jmonth(self):
+        """Jewish Month - Nissan = 1, Adar II = 13"""
+        return abs_date_to_jdate(self._ordinal)[1]
+
+    @property
+    def jday(self):
+        """Jewish Day"""
+        return abs_date_to_jdate(self._ordinal)[2]
+
+    @property
+    def dayofweek(self):
+        """Day of the week as a number between Sunday=1, Saturday=7."""
+        return self._ordinal % 7 + 1
@@ -18,7 +18,7 @@
 #import java.util.Calendar
 from datetime import datetime
 import math
-from utils import AstronomicalCalculator
+from .utils import AstronomicalCalculator
 
 """*
  * Implementation of sunrise and sunset methods to calculate astronomical times based on the <a
@@ -16,7 +16,7 @@
 from datetime import datetime, timedelta
 
 from pytz import timezone
-from utils import GeoLocation, SunTimesCalculator, AstronomicalCalculator
+from .utils import GeoLocation, SunTimesCalculator, AstronomicalCalculator
 
 class AstronomicalCalendar(AstronomicalCalculator):
     """A calendar that calculates astronomical times such as sunrise and sunset times. This class contains a
@@ -194,8 +194,10 @@ class AstronomicalCalendar(AstronomicalCalculator):
         else:
             return self.getAdjustedSunsetDate(self.getDateFromTime(sunset), self.getSunriseOffsetByDegrees(offsetZenith))
 
-    def __init__(self, geoLocation=GeoLocation(), dt=None):
+    def __init__(self, geoLocation=None, dt=None):
         """Initialise the Class - geolocation and datetime as parameters (Defaults to Greenwich and current system time)"""
+        if geoLocation is None:
+            geoLocation = GeoLocation()
         if not dt:
             self._dt = datetime.now(tz=geoLocation.timeZone)
         else:
@@ -485,6 +487,7 @@ class ZmanimCalendar(AstronomicalCalendar):
         """
         return self.getTemporalHour(self.getAlos72(), self.getTzais72())
 
-    def __init__(self, location=GeoLocation(), datetime=None):
-        """Initialise the class - takes a Geolocation and Datetime as arguments"""
+    def __init__(self, location=None, datetime=None):
+        """Initialise the class - takes a Geolocation and Datetime as arguments (Defaults to Greenwich and current
+        system time)"""
         super(ZmanimCalendar, self).__init__(location, datetime)
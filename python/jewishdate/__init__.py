@@ -1,2 +1,2 @@
-from .JewishDate import JewishDate, JewishCalendar
+from .JewishDate import JewishDate, JewishCalendar, FrozenJewishDate
 from .HebrewDateFormatter import HebrewDateFormatter
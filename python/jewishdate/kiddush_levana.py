@@ -0,0 +1,68 @@
+"""Kiddush Levana times for many months and locations at once.
+
+The molad is announced in Jerusalem local mean time, 2:20:56.496 ahead of UTC (longitude
+35.2354), so that is converted to UTC first. Kiddush Levana can be said from 3 days (or 7 days)
+after the molad until half way to the next molad (or 15 days after the molad).
+
+The times are calculated from the molad columns of get_molados / get_jyear_molados, so a span of
+months is calculated once and only converted to local time per time zone:
+
+    molados = get_jyear_molados(5784, 5786)
+    utc_times = get_kiddush_levana_utc(molados)
+    local_times = get_kiddush_levana_times(molados, [lakewood, jerusalem])
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from pytz import utc
+
+from .JewishDate import CHALAKIM_PER_DAY, CHALAKIM_PER_HOUR, CHALAKIM_PER_MONTH, JEWISH_EPOCH
+
+KiddushLevanaTimes = namedtuple('KiddushLevanaTimes', 'jyear jmonth molad earliest_3_days '
+                                'earliest_7_days latest_between_molados latest_15_days')
+
+JERUSALEM_MEAN_TIME_OFFSET = timedelta(hours=2, minutes=20, seconds=56, microseconds=496000)
+THREE_DAYS = timedelta(days=3)
+SEVEN_DAYS = timedelta(days=7)
+HALF_MONTH = timedelta(microseconds=CHALAKIM_PER_MONTH * 10 ** 7 // 6)
+FIFTEEN_DAYS = timedelta(days=15)
+
+
+def get_molad_utc(molad):
+    """Returns the molad given in chalakim since molad tohu (see get_chalakim_since_molad_tohu)
+    as a UTC datetime
+    """
+    # the molad day starts at 18:00, move it to midnight
+    day, chalakim = divmod(molad + 18 * CHALAKIM_PER_HOUR, CHALAKIM_PER_DAY)
+    return (datetime.fromordinal(day + JEWISH_EPOCH).replace(tzinfo=utc)
+            + timedelta(microseconds=chalakim * 10 ** 7 // 3) - JERUSALEM_MEAN_TIME_OFFSET)
+
+def get_kiddush_levana_utc(molados):
+    """Returns a list of KiddushLevanaTimes in UTC, one for every month of the Molados"""
+    times = []
+    for jyear, jmonth, molad in zip(molados.years, molados.months, molados.molads):
+        molad_utc = get_molad_utc(molad)
+        times.append(KiddushLevanaTimes(jyear, jmonth, molad_utc, molad_utc + THREE_DAYS,
+                                        molad_utc + SEVEN_DAYS, molad_utc + HALF_MONTH,
+                                        molad_utc + FIFTEEN_DAYS))
+    return times
+
+def _to_local(times, tz):
+    """Returns the KiddushLevanaTimes converted to the time zone"""
+    return [KiddushLevanaTimes(t.jyear, t.jmonth, *[dt.astimezone(tz) for dt in t[2:]])
+            for t in times]
+
+def get_kiddush_levana_times(molados, locations):
+    """Returns a list with a list of KiddushLevanaTimes for every one of the locations
+    (GeoLocation objects), in the location's time zone. The times are calculated once and
+    converted once per time zone, locations sharing a time zone share the same list.
+    """
+    times = get_kiddush_levana_utc(molados)
+    by_zone = {}
+    result = []
+    for location in locations:
+        tz = location.timeZone
+        if tz not in by_zone:
+            by_zone[tz] = _to_local(times, tz)
+        result.append(by_zone[tz])
+    return result
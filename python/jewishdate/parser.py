@@ -0,0 +1,142 @@
+"""Parses Jewish dates written like HebrewDateFormatter.format_date back into their components.
+
+Both the Hebrew and the transliterated forms are understood, with or without geresh and
+gershayim (ASCII quotes work as well), with the year with or without its thousands:
+
+    parse_jdate("כ״ד סיון תשע״ז") # (5777, 3, 24)
+    parse_jdate('כ"ד סיון ה\'תשע"ז') # (5777, 3, 24)
+    parse_jdate("24 Sivan, 5777") # (5777, 3, 24)
+    parse_jdates(rows, skip_invalid=True) # a list, None for the rows that can't be parsed
+
+Hebrew numbers are looked up in a reverse map of formatHebrewNumber's output and month names
+in a reverse map of the formatter's month names, both built the first time they are needed.
+A year without its thousands is in the 5000s, like HebrewDateFormatter.y writes it. "Adar" is
+month 12 (ADAR, Adar I on a leap year), as Adar II is always written with its number.
+"""
+from .HebrewDateFormatter import HebrewDateFormatter
+from .JewishDate import (validateJewishDate, ADAR, ADAR_II, CHESHVAN, IYAR, NISSAN, SHEVAT,
+                         SIVAN, TAMUZ, TEVES, TISHREI)
+
+# removes the geresh, gershayim and the quotes typed instead of them, and replaces final
+# letters, so every way of writing a number or month looks the same
+_NORMALIZE = dict.fromkeys(map(ord, '\'"`׳״‘’“”′″'))
+_NORMALIZE.update((ord(final), regular) for final, regular in zip('ךםןףץ', 'כמנפצ'))
+_NORMALIZE[ord(',')] = ' '
+
+# spellings in common use besides the formatter's month names
+MONTH_SPELLINGS = {
+    "Nisan": NISSAN, "Iyyar": IYAR, "Sivan": SIVAN, "Tamuz": TAMUZ, "Tishri": TISHREI,
+    "Heshvan": CHESHVAN, "Marcheshvan": CHESHVAN, "Tevet": TEVES, "Shvat": SHEVAT,
+    "Adar 1": ADAR, "Adar 2": ADAR_II,
+    "חשוון": CHESHVAN, "מרחשון": CHESHVAN, "מרחשוון": CHESHVAN, "סיוון": SIVAN,
+    "אדר ראשון": ADAR, "אדר שני": ADAR_II,
+}
+
+_numbers = None # normalized Hebrew number (1 - 999) -> number
+_months = None # normalized month name -> month
+_THOUSANDS = 'אלפימ' # "אלפים" normalized, as in "ה׳ אלפים"
+
+
+def _normalize(text):
+    """Returns the text lower case with quotes removed, final letters replaced and commas as
+    spaces
+    """
+    return text.translate(_NORMALIZE).lower()
+
+def _build_maps():
+    """Fills the reverse maps of Hebrew numbers and month names"""
+    global _numbers, _months
+    formatter = HebrewDateFormatter(use_gersh_gershayim=False, use_long_hebrew_years=False)
+    numbers = {}
+    for number in range(1, 1000):
+        numbers[_normalize(formatter.formatHebrewNumber(number))] = number
+    months = {}
+    for index, name in enumerate(formatter.transliterated_months[:13]):
+        months[_normalize(name)] = index + 1
+    for index, name in enumerate(formatter.hebrew_months[:13]):
+        months[_normalize(name)] = index + 1
+    months[_normalize(formatter.transliterated_months[13])] = ADAR # Adar I
+    months[_normalize(formatter.hebrew_months[13])] = ADAR
+    for name, month in MONTH_SPELLINGS.items():
+        months[_normalize(name)] = month
+    _numbers, _months = numbers, months
+
+def _parse_number(text, numbers):
+    """Returns the number written in digits or Hebrew letters, or None"""
+    if text.isdigit():
+        return int(text)
+    return numbers.get(text)
+
+def _parse_year(text, numbers):
+    """Returns the year written in digits or Hebrew letters with or without its thousands, or
+    None
+    """
+    if text.isdigit():
+        return int(text)
+    year = numbers.get(text)
+    if year is not None:
+        return 5000 + year
+    thousands = numbers.get(text[:1])
+    if thousands is None or thousands > 9:
+        return None
+    if text[1:] == _THOUSANDS:
+        return thousands * 1000
+    year = numbers.get(text[1:])
+    if year is None:
+        return None
+    return thousands * 1000 + year
+
+def _parse(text):
+    """Returns the (jyear, jmonth, jday) of the text, or None if it isn't a date"""
+    if _numbers is None:
+        _build_maps()
+    words = _normalize(text).split()
+    if len(words) < 3:
+        return None
+    day = _parse_number(words[0], _numbers)
+    # the month can be 2 words, e.g. "Adar II", try that first
+    month = _months.get(words[1] + ' ' + words[2]) if len(words) > 3 else None
+    if month is not None:
+        year_words = words[3:]
+    else:
+        month = _months.get(words[1])
+        if month is None and words[1][:1] == 'ב': # as in כ״ד בסיון
+            month = _months.get(words[1][1:])
+        year_words = words[2:]
+    if day is None or month is None or len(year_words) > 2:
+        return None
+    year = _parse_year(''.join(year_words), _numbers)
+    if year is None:
+        return None
+    try:
+        validateJewishDate(year, month, day)
+    except ValueError:
+        return None
+    return (year, month, day)
+
+def parse_jdate(text):
+    """Returns the (jyear, jmonth, jday) of a date written as day, month and year in Hebrew or
+    transliterated, e.g. "כ״ד סיון תשע״ז" or "24 Sivan, 5777". Raises a ValueError if the text
+    isn't a valid Jewish date.
+    """
+    jdate = _parse(text)
+    if jdate is None:
+        raise ValueError("%r isn't a Jewish date" % text)
+    return jdate
+
+def parse_jdates(texts, skip_invalid=False):
+    """Returns a list of the (jyear, jmonth, jday) of every text, see parse_jdate. Every distinct
+    text is only parsed once. With skip_invalid the texts that aren't dates give None instead
+    of raising a ValueError.
+    """
+    parsed = {}
+    result = []
+    for text in texts:
+        try:
+            jdate = parsed[text]
+        except KeyError:
+            jdate = parsed[text] = _parse(text)
+        if jdate is None and not skip_invalid:
+            raise ValueError("%r isn't a Jewish date" % text)
+        result.append(jdate)
+    return result
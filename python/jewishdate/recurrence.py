@@ -0,0 +1,229 @@
+"""Recurrence rules for events on the Jewish calendar.
+
+A rule knows the days it occurs on in a Jewish year, from the year's month lengths and the
+holiday templates, so finding an occurrence never steps through the days in between:
+
+    rule = AnnualRule(ADAR, 14, leap_jmonth=ADAR_II) # Purim
+    rule.next_after(date.today().toordinal())
+    for abs_date in RoshChodeshRule().between(start, stop):
+        ...
+
+All dates are absolute dates (Gregorian ordinals).
+"""
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from .JewishDate import (_get_anniversary, _get_yahrzeit, abs_date_to_jdate,
+                         datetimeToJewishDate, get_anniversary_signature, get_days_in_jmonth,
+                         get_jyear_info, get_yahrzeit_signature, get_year_template,
+                         is_jyear_leap, jdate_to_abs_date, ADAR_II, ELUL, LEAP_YEAR_MONTHS,
+                         TISHREI, YEAR_MONTHS)
+
+MAX_SEARCH_YEARS = 100 # years searched by next_after and previous_before before giving up
+INDEX_CACHE_YEARS = 4 # years of dates kept by every AnniversaryIndex
+
+
+class RecurrenceRule(object):
+    """Base class of the rules. Subclasses implement get_occurrences"""
+
+    def get_occurrences(self, jyear):
+        """Returns a sorted tuple of the absolute dates the rule occurs on in a Jewish year"""
+        raise NotImplementedError
+
+    def between(self, start, stop):
+        """Generates the absolute dates the rule occurs on from start up to (not including)
+        stop, one Jewish year at a time
+        """
+        if start >= stop:
+            return
+        jyear = abs_date_to_jdate(start)[0]
+        while get_jyear_info(jyear).rosh_hashana < stop:
+            for abs_date in self.get_occurrences(jyear):
+                if start <= abs_date < stop:
+                    yield abs_date
+            jyear += 1
+
+    def next_after(self, abs_date):
+        """Returns the first absolute date after abs_date the rule occurs on, or None if it
+        doesn't occur in the next MAX_SEARCH_YEARS years
+        """
+        jyear = abs_date_to_jdate(abs_date)[0]
+        for jyear in range(jyear, jyear + MAX_SEARCH_YEARS):
+            occurrences = self.get_occurrences(jyear)
+            index = bisect_right(occurrences, abs_date)
+            if index < len(occurrences):
+                return occurrences[index]
+        return None
+
+    def previous_before(self, abs_date):
+        """Returns the last absolute date before abs_date the rule occurs on, or None if it
+        didn't occur in the previous MAX_SEARCH_YEARS years
+        """
+        jyear = abs_date_to_jdate(abs_date)[0]
+        for jyear in range(jyear, jyear - MAX_SEARCH_YEARS, -1):
+            occurrences = self.get_occurrences(jyear)
+            index = bisect_left(occurrences, abs_date)
+            if index > 0:
+                return occurrences[index - 1]
+        return None
+
+
+class AnnualRule(RecurrenceRule):
+    """A Jewish month and day every year.
+
+    Arguments:
+    jmonth -- the Jewish month. Nissan = 1 Adar II = 13
+    jday -- the day of month
+    leap_jmonth -- the month used instead on a leap year, e.g. ADAR_II for Purim
+    fallback -- a (jmonth, jday) tuple used when the day doesn't exist in the year (30 Cheshvan,
+    30 Kislev, 30 Adar I or Adar II on a regular year). Without it there is no occurrence.
+
+    "30 Cheshvan else 1 Kislev" is AnnualRule(CHESHVAN, 30, fallback=(KISLEV, 1)).
+    """
+
+    def __init__(self, jmonth, jday, leap_jmonth=None, fallback=None):
+        self.jmonth = jmonth
+        self.jday = jday
+        self.leap_jmonth = leap_jmonth
+        self.fallback = fallback
+
+    def get_occurrences(self, jyear):
+        leap = is_jyear_leap(jyear)
+        jmonth = self.leap_jmonth if leap and self.leap_jmonth else self.jmonth
+        jday = self.jday
+        if ((jmonth == ADAR_II and not leap) or jday > get_days_in_jmonth(jmonth, jyear)):
+            if self.fallback is None:
+                return ()
+            jmonth, jday = self.fallback
+        return (jdate_to_abs_date(jyear, jmonth, jday),)
+
+
+class RoshChodeshRule(RecurrenceRule):
+    """Every day of Rosh Chodesh, the 30th of a month and the 1st of every month but Tishrei,
+    like JewishCalendar.is_rosh_chodesh
+    """
+
+    def get_occurrences(self, jyear):
+        info = get_jyear_info(jyear)
+        occurrences = []
+        for jmonth in LEAP_YEAR_MONTHS if info.leap else YEAR_MONTHS:
+            first = info.rosh_hashana + info.month_starts[jmonth]
+            if jmonth != TISHREI:
+                occurrences.append(first)
+            if info.month_lengths[jmonth] == 30:
+                occurrences.append(first + 29)
+        return tuple(occurrences)
+
+
+class ShabbosMevarchimRule(RecurrenceRule):
+    """The Shabbos before Rosh Chodesh (between the 23rd and 29th of the month) the new month is
+    blessed on, every month but Elul
+    """
+
+    def get_occurrences(self, jyear):
+        info = get_jyear_info(jyear)
+        occurrences = []
+        for jmonth in LEAP_YEAR_MONTHS if info.leap else YEAR_MONTHS:
+            if jmonth != ELUL:
+                day_29 = info.rosh_hashana + info.month_starts[jmonth] + 28
+                occurrences.append(day_29 - (day_29 - 6) % 7) # ordinal % 7 == 6 on Shabbos
+        return tuple(occurrences)
+
+
+class YomTovRule(RecurrenceRule):
+    """Every day with a JewishCalendar holiday index, e.g. JewishCalendar.CHANUKAH. The days come
+    from the holiday templates, see get_year_template.
+    """
+
+    def __init__(self, yom_tov_index, in_israel=False, use_modern_holidays=False):
+        self.yom_tov_index = yom_tov_index
+        self.in_israel = in_israel
+        self.use_modern_holidays = use_modern_holidays
+        self._offsets = {} # days since Rosh Hashana by year type
+
+    def get_occurrences(self, jyear):
+        info = get_jyear_info(jyear)
+        year_type = (info.rosh_hashana % 7 + 1, info.kviah, info.leap)
+        offsets = self._offsets.get(year_type)
+        if offsets is None:
+            template = get_year_template(*(year_type + (self.in_israel,
+                                                        self.use_modern_holidays)))
+            offsets = self._offsets[year_type] = tuple(
+                offset for offset, index in enumerate(template.holidays)
+                if index == self.yom_tov_index)
+        return tuple(info.rosh_hashana + offset for offset in offsets)
+
+
+class AnniversaryIndex(object):
+    """Finds the events recurring on a Jewish date (birthdays, anniversaries or yahrzeits) that
+    fall on a day.
+
+    Events are kept in buckets by month, day and the part of the original year the rules depend
+    on (see get_anniversary_signature and get_yahrzeit_signature), sorted by the original year.
+    For a Jewish year the absolute date of every bucket is calculated once, so a lookup only
+    touches the buckets falling on the day. Several buckets can fall on the same day, e.g. 30
+    Kislev and 1 Teves when Kislev is short.
+
+    Arguments:
+    yahrzeit -- use the yahrzeit rules (get_yahrzeit) instead of the anniversary rules
+    (get_anniversary)
+    """
+
+    def __init__(self, yahrzeit=False):
+        self.yahrzeit = yahrzeit
+        if yahrzeit:
+            self._get_signature = get_yahrzeit_signature
+            self._get_observance = _get_yahrzeit
+        else:
+            self._get_signature = get_anniversary_signature
+            self._get_observance = _get_anniversary
+        self._buckets = {} # (jmonth, jday, signature) -> (original years, events)
+        self._years = OrderedDict() # Jewish year -> {absolute date: [bucket keys]}
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def add(self, jyear, jmonth, jday, event):
+        """Adds an event recurring on the Jewish date"""
+        key = (jmonth, jday, self._get_signature(jyear, jmonth, jday))
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = ([], [])
+            self._years.clear()
+        years, events = bucket
+        index = bisect_right(years, jyear)
+        years.insert(index, jyear)
+        events.insert(index, event)
+        self._count += 1
+
+    def add_date(self, date, event):
+        """Adds an event recurring on the Jewish date of a date or datetime"""
+        jyear, jmonth, jday = datetimeToJewishDate(date)
+        self.add(jyear, jmonth, jday, event)
+
+    def _get_year(self, jyear):
+        """Returns a dict of the bucket keys falling on every absolute date of the Jewish year"""
+        try:
+            return self._years[jyear]
+        except KeyError:
+            pass
+        dates = {}
+        for key in self._buckets:
+            jmonth, jday, signature = key
+            dates.setdefault(self._get_observance(jmonth, jday, signature, jyear), []).append(key)
+        if len(self._years) >= INDEX_CACHE_YEARS:
+            self._years.popitem(last=False)
+        self._years[jyear] = dates
+        return dates
+
+    def events_on(self, abs_date):
+        """Returns a list of the events falling on an absolute date (Gregorian ordinal). Only
+        events from before the Jewish year of the day are included.
+        """
+        jyear = abs_date_to_jdate(abs_date)[0]
+        result = []
+        for key in self._get_year(jyear).get(abs_date, ()):
+            years, events = self._buckets[key]
+            result.extend(events[:bisect_left(years, jyear)])
+        return result
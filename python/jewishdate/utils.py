@@ -494,7 +494,7 @@ class GeoLocation(GeoLocationUtils):
             raise IllegalArgumentException("Elevation cannot be negative")
         self._elevation = elevation
 
-    def __init__(self, name="Greenwich, England", latitude=51.4772, longitude=0, elevation=0, tz=timezone("Etc/GMT")):
+    def __init__(self, name="Greenwich, England", latitude=51.4772, longitude=0, elevation=0, tz=None):
         """GeoLocation constructor with parameters for all required fields.
         
         Keyword Arguments:
@@ -508,6 +508,8 @@ class GeoLocation(GeoLocationUtils):
         sunrise and set.
         tz -- the TimeZone for the location. (Default timezone("Etc/GMT"))
         """
+        if tz is None:
+            tz = timezone("Etc/GMT")
         self.locationName = name
         self.setLatitude(latitude)
         self.setLongitude(longitude)
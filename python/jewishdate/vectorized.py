@@ -0,0 +1,142 @@
+"""NumPy kernels converting whole arrays between Gregorian ordinals and Jewish dates.
+
+These use the same calendar rules as jdate_to_abs_date and datetimeToJewishDate, but work on
+integer arrays and never create a JewishDate. NumPy is only needed by this module.
+"""
+import numpy as np
+
+from .JewishDate import (_compute_jyear_info, ADAR, ADAR_II, CHESHVAN, KISLEV, LEAP_YEAR_MONTHS,
+                         NISSAN, SHEVAT, TEVES, YEAR_MONTHS)
+
+FIRST_JYEAR = 3761 # year of 1/1/1 Gregorian
+LAST_JYEAR = 13761 # year after 31/12/9999 Gregorian, the last date a datetime can hold
+
+
+class _CalendarTable(object):
+    """Per-year and per-month arrays for FIRST_JYEAR - LAST_JYEAR"""
+
+    def __init__(self):
+        infos = [_compute_jyear_info(year) for year in range(FIRST_JYEAR, LAST_JYEAR + 1)]
+        self.rosh_hashana = np.array([info.rosh_hashana for info in infos], dtype=np.int64)
+        self.leap = np.array([info.leap for info in infos], dtype=bool)
+        self.month_lengths = np.array([info.month_lengths for info in infos], dtype=np.int64)
+        self.month_starts = np.array([info.month_starts for info in infos], dtype=np.int64)
+        self.month_starts += self.rosh_hashana[:, None]
+        # ordinal of the 1st of every month in calendar order, with its year and month
+        month_start = []
+        month_year = []
+        month_number = []
+        for year, info in enumerate(infos, FIRST_JYEAR):
+            months = LEAP_YEAR_MONTHS if info.leap else YEAR_MONTHS
+            month_start.extend(info.rosh_hashana + offset for offset in info.month_offsets)
+            month_year.extend([year] * len(months))
+            month_number.extend(months)
+        # the end of the table, so that the last month has an upper bound
+        month_start.append(infos[-1].rosh_hashana + infos[-1].days)
+        self.month_start = np.array(month_start, dtype=np.int64)
+        self.month_year = np.array(month_year, dtype=np.int64)
+        self.month_number = np.array(month_number, dtype=np.int64)
+
+_table = None
+
+def _get_table():
+    global _table
+    if _table is None:
+        _table = _CalendarTable()
+    return _table
+
+def ordinals_to_jdates(ordinals):
+    """Converts absolute dates (Gregorian ordinals) to Jewish dates.
+    Returns a tuple of (jyears, jmonths, jdays) integer arrays shaped like ordinals.
+    Raises a ValueError for dates outside of the years FIRST_JYEAR - LAST_JYEAR.
+    """
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    table = _get_table()
+    index = np.searchsorted(table.month_start, ordinals, side='right') - 1
+    if ordinals.size and (index.min() < 0 or index.max() >= len(table.month_year)):
+        raise ValueError("Ordinals have to be between %s and %s"
+                         % (table.month_start[0], table.month_start[-1] - 1))
+    jdays = ordinals - table.month_start[index] + 1
+    return table.month_year[index], table.month_number[index], jdays
+
+def jdates_to_ordinals(jyears, jmonths, jdays):
+    """Converts Jewish dates to absolute dates (Gregorian ordinals). The arguments are integer
+    arrays (or scalars) that are broadcast against each other, months are Nissan = 1 and
+    Adar II = 13. Like jdate_to_abs_date the dates are not validated, only the years have to be
+    between FIRST_JYEAR and LAST_JYEAR.
+    """
+    jyears, jmonths, jdays = np.broadcast_arrays(np.asarray(jyears, dtype=np.int64),
+                                                 np.asarray(jmonths, dtype=np.int64),
+                                                 np.asarray(jdays, dtype=np.int64))
+    if jyears.size and (jyears.min() < FIRST_JYEAR or jyears.max() > LAST_JYEAR):
+        raise ValueError("Jewish years have to be between %s and %s" % (FIRST_JYEAR, LAST_JYEAR))
+    table = _get_table()
+    return table.month_starts[jyears - FIRST_JYEAR, jmonths] + jdays - 1
+
+def _broadcast_jdates(jyears, jmonths, jdays, target_jyears):
+    """Returns the arguments as broadcast int64 arrays, checking the years are in the table"""
+    arrays = np.broadcast_arrays(*[np.asarray(a, dtype=np.int64)
+                                   for a in (jyears, jmonths, jdays, target_jyears)])
+    for years in (arrays[0], arrays[3]):
+        if years.size and (years.min() < FIRST_JYEAR or years.max() > LAST_JYEAR):
+            raise ValueError("Jewish years have to be between %s and %s"
+                             % (FIRST_JYEAR, LAST_JYEAR))
+    return arrays
+
+def jdates_to_yahrzeits(jyears, jmonths, jdays, target_jyears):
+    """Returns the absolute dates (Gregorian ordinals) of the yahrzeits in target_jyears of
+    deaths on the Jewish dates, with the rules of get_yahrzeit. The arguments are broadcast
+    against each other, so target_jyears can be a single year. Where the target year isn't
+    after the year of death the result is 0.
+    """
+    jyears, jmonths, jdays, target_jyears = _broadcast_jdates(jyears, jmonths, jdays,
+                                                              target_jyears)
+    table = _get_table()
+    target = target_jyears - FIRST_JYEAR
+    leap = table.leap[target]
+    # 30 Cheshvan or Kislev when the month was short on the first yahrzeit
+    first = np.minimum(jyears + 1, LAST_JYEAR) - FIRST_JYEAR
+    before_rosh_chodesh = ((jdays == 30) & ((jmonths == CHESHVAN) | (jmonths == KISLEV))
+                           & (table.month_lengths[first, jmonths] == 29))
+    jmonths = np.where(jmonths == ADAR_II, np.where(leap, ADAR_II, ADAR), jmonths)
+    jmonths = np.where((jmonths == ADAR) & (jdays == 30) & ~leap, SHEVAT, jmonths)
+    # 30 Cheshvan or Kislev in a year the month is short is kept on Rosh Chodesh
+    rosh_chodesh = (jdays == 30) & (table.month_lengths[target, jmonths] == 29)
+    next_month = np.minimum(jmonths + 1, TEVES) # only used for Cheshvan and Kislev
+    ordinals = np.where(rosh_chodesh | before_rosh_chodesh,
+                        table.month_starts[target, next_month] - before_rosh_chodesh,
+                        table.month_starts[target, jmonths] + jdays - 1)
+    return np.where(target_jyears > jyears, ordinals, 0)
+
+def jdates_to_anniversaries(jyears, jmonths, jdays, target_jyears):
+    """Returns the absolute dates (Gregorian ordinals) of the anniversaries (birthdays) in
+    target_jyears of the Jewish dates, with the rules of get_anniversary. The arguments are
+    broadcast against each other. Where the target year isn't after the year of the date the
+    result is 0.
+    """
+    jyears, jmonths, jdays, target_jyears = _broadcast_jdates(jyears, jmonths, jdays,
+                                                              target_jyears)
+    table = _get_table()
+    target = target_jyears - FIRST_JYEAR
+    leap = table.leap[target]
+    jmonths = np.where(jmonths == ADAR_II, np.where(leap, ADAR_II, ADAR), jmonths)
+    jmonths = np.where((jmonths == ADAR) & ~table.leap[jyears - FIRST_JYEAR] & leap,
+                       ADAR_II, jmonths)
+    # the 30th of a month that is short in the target year is kept on Rosh Chodesh
+    rosh_chodesh = (jdays == 30) & (table.month_lengths[target, jmonths] == 29)
+    next_month = np.where(jmonths == ADAR, NISSAN, jmonths + 1)
+    ordinals = np.where(rosh_chodesh, table.month_starts[target, np.minimum(next_month, ADAR_II)],
+                        table.month_starts[target, jmonths] + jdays - 1)
+    return np.where(target_jyears > jyears, ordinals, 0)
+
+def ordinals_to_yahrzeits(ordinals, target_jyears):
+    """Returns the yahrzeits of deaths on absolute dates (Gregorian ordinals), see
+    jdates_to_yahrzeits
+    """
+    return jdates_to_yahrzeits(*(ordinals_to_jdates(ordinals) + (target_jyears,)))
+
+def ordinals_to_anniversaries(ordinals, target_jyears):
+    """Returns the anniversaries of absolute dates (Gregorian ordinals), see
+    jdates_to_anniversaries
+    """
+    return jdates_to_anniversaries(*(ordinals_to_jdates(ordinals) + (target_jyears,)))
@@ -1,8 +1,24 @@
 #! /usr/bin/python
 # -*- coding: utf-8 -*-
-from jewishdate import JewishDate
-from datetime import datetime
+from jewishdate import JewishDate, JewishCalendar, FrozenJewishDate
+from jewishdate.JewishDate import (get_jyear_info, jdate_to_abs_date, get_days_in_jyear,
+                                   abs_date_to_jdate, add_jmonths, CHASERIM, SHELAIMIM,
+                                   NISSAN, ELUL, TISHREI, CHESHVAN, KISLEV, TEVES, SHEVAT, ADAR,
+                                   ADAR_II, get_jyear_template, get_parshiyos,
+                                   get_daf_yomi_bavli_range, get_molad, get_molados,
+                                   get_jyear_molados, get_yahrzeit, get_anniversary, get_day_info)
+from datetime import datetime, timedelta
+import subprocess
+import sys
 import unittest
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    import pytz
+except ImportError:
+    pytz = None
 
 #!a = hebrew day name (yom rishon)(ithout the word yom)(in heabrew)
 #!A = endlish day name (with shabbos)
@@ -46,6 +62,136 @@ class TestStringMethods(unittest.TestCase):
     def test_8(self):
         self.assertEqual(JewishDate(datetime(2017, 6,18)).format("hello #v"), "hello #v")
 
+    def test_shared_formatter(self):
+        from jewishdate import HebrewDateFormatter
+        formatter = HebrewDateFormatter.get_shared(hebrew=True)
+        self.assertTrue(formatter is HebrewDateFormatter.get_shared(hebrew=True))
+        self.assertFalse(formatter is HebrewDateFormatter.get_shared(hebrew=True,
+                                                                     use_gersh_gershayim=False))
+        with self.assertRaises(AttributeError):
+            formatter.use_gersh_gershayim = False
+        jdate = JewishDate(datetime(2017, 6, 18))
+        self.assertEqual(formatter.format(jdate, "#E #e"), "כד כ״ד")
+        self.assertTrue(formatter.use_gersh_gershayim)
+        self.assertEqual(jdate.heb_string, formatter.format_date(jdate))
+        self.assertEqual(str(jdate), "24 Sivan, 5777")
+
+    def test_compile_format(self):
+        from jewishdate import HebrewDateFormatter
+        from jewishdate.HebrewDateFormatter import FORMAT_CACHE_SIZE, _format_programs
+        leading, steps = HebrewDateFormatter.compile_format("%A ###e #x #b")
+        self.assertEqual(leading, "%A #")
+        self.assertEqual([(method.__name__, text) for method, text in steps],
+                         [('e', ' #x '), ('b', '')])
+        program = HebrewDateFormatter.compile_format("%A ###e #x #b")
+        self.assertTrue(program is HebrewDateFormatter.compile_format("%A ###e #x #b"))
+        for i in range(FORMAT_CACHE_SIZE + 1):
+            HebrewDateFormatter.compile_format("#e %s" % i)
+        self.assertEqual(len(_format_programs), FORMAT_CACHE_SIZE)
+        self.assertEqual(JewishDate(datetime(2017, 6, 18)).format("%A ###e #x #b"),
+                         "Sunday #כ״ד #x סיון")
+
+    def test_custom_directives(self):
+        from jewishdate import HebrewDateFormatter
+
+        class Formatter(HebrewDateFormatter):
+            def h(self, jewishdate):
+                return "custom"
+
+            def b(self, jewishdate):
+                return "month %s" % jewishdate.jmonth
+
+        jdate = JewishDate(datetime(2017, 6, 18))
+        formatter = Formatter(hebrew=True)
+        self.assertEqual(formatter.format(jdate, "#h #e #b"), "custom כ״ד month 3")
+        self.assertEqual(formatter.format_date(jdate), "כ״ד month 3 תשע״ז")
+        self.assertEqual(formatter.formatDayOfWeek(jdate), "ראשון")
+        formatter.e = lambda jewishdate: "day"
+        self.assertEqual(formatter.format(jdate, "#h #e #b"), "custom day month 3")
+        self.assertEqual(HebrewDateFormatter(hebrew=True).format(jdate, "#h #e #b"),
+                         "#h כ״ד סיון")
+
+    def test_native_strftime(self):
+        for dt in (datetime(2017, 6, 18, 9, 5, 7), datetime(999, 6, 18),
+                   datetime(2017, 6, 18).date()):
+            jdate = JewishDate(dt)
+            day, hebrew_day = jdate.format("#D"), jdate.format("#e")
+            for format_string in ("%d/%m/%Y %H:%M:%S #e", "%%d %Y%%", "#D %A %j", "%", "#e %"):
+                self.assertEqual(jdate.format(format_string),
+                                 dt.strftime(format_string.replace("#e", hebrew_day)
+                                             .replace("#D", day)))
+
+    def test_format_many(self):
+        import io
+        from jewishdate import HebrewDateFormatter
+        formatter = HebrewDateFormatter(hebrew=True)
+        dates = [datetime(2016, 3, 1) + timedelta(days=i) for i in range(60)] # Adar I - Nissan
+        jdates = [JewishDate(d) for d in dates]
+        for format_string in ("#a #e #b #y", "%d/%m/%Y #B #Y", "#e %%", None):
+            if format_string is None:
+                expected = [formatter.format_date(d) for d in jdates]
+            else:
+                expected = [formatter.format(d, format_string) for d in jdates]
+            self.assertEqual(formatter.format_many(dates, format_string), expected)
+            self.assertEqual(formatter.format_many([FrozenJewishDate(d) for d in dates],
+                                                   format_string), expected)
+            output = io.StringIO()
+            formatter.write_many(output, jdates, format_string)
+            self.assertEqual(output.getvalue().splitlines(), expected)
+
+    def test_format_many_overrides(self):
+        from jewishdate import HebrewDateFormatter
+
+        class Formatter(HebrewDateFormatter):
+            def b(self, jewishdate): # not the same for the whole month
+                return "month %s day %s" % (jewishdate.jmonth, jewishdate.jday)
+
+        class DateFormatter(HebrewDateFormatter):
+            def format_date(self, jewishdate):
+                return "date %s" % jewishdate.jday
+
+        jdates = [JewishDate(datetime(2017, 6, 18) + timedelta(days=i)) for i in range(3)]
+        formatter = Formatter(hebrew=True)
+        for format_string in ("#e #b", None):
+            if format_string is None:
+                expected = [formatter.format_date(d) for d in jdates]
+            else:
+                expected = [formatter.format(d, format_string) for d in jdates]
+            self.assertEqual(formatter.format_many(jdates, format_string), expected)
+        self.assertEqual(expected[2], "כ״ו month 3 day 26 תשע״ז")
+        self.assertEqual(DateFormatter().format_many(jdates), ["date 24", "date 25", "date 26"])
+        formatter = HebrewDateFormatter()
+        formatter.D = lambda jewishdate: "day"
+        self.assertEqual(formatter.format_many(jdates[:1], "#D #B"), ["day Sivan"])
+
+    def test_hebrew_number(self):
+        from jewishdate import HebrewDateFormatter
+        formatter = HebrewDateFormatter()
+        self.assertEqual(formatter.formatHebrewNumber(5000), "ה׳ אלפים")
+        self.assertEqual(HebrewDateFormatter(use_long_hebrew_years=True).formatHebrewNumber(5777),
+                         "ה׳ תשע״ז")
+        self.assertEqual(HebrewDateFormatter(use_gersh_gershayim=False).formatHebrewNumber(5777),
+                         "תשעז")
+        formatter.use_gersh_gershayim = False
+        self.assertEqual(formatter.formatHebrewNumber(15), "טו")
+        self.assertEqual(HebrewDateFormatter().formatHebrewNumber(15), "ט״ו")
+        with self.assertRaises(ValueError):
+            formatter.formatHebrewNumber(10000)
+
+    def test_hebrew_number_override(self):
+        from jewishdate import HebrewDateFormatter
+
+        class Formatter(HebrewDateFormatter):
+            def formatHebrewNumber(self, number):
+                return "N%d" % number
+
+        jdate = JewishDate(datetime(2017, 6, 18))
+        formatter = Formatter(hebrew=True)
+        self.assertEqual(formatter.format_date(jdate), "N24 סיון N5777")
+        self.assertEqual(formatter.format(jdate, "#e #E #b #y"), "N24 N24 סיון N5777")
+        self.assertEqual(formatter.format_many([jdate], "#e #y"), ["N24 N5777"])
+        self.assertEqual(formatter.format_many([jdate]), ["N24 סיון N5777"])
+
     def test_isupper(self):
         self.assertTrue('FOO'.isupper())
         self.assertFalse('Foo'.isupper())
@@ -57,5 +203,524 @@ class TestStringMethods(unittest.TestCase):
         with self.assertRaises(TypeError):
             s.split(2)
 
+
+class TestYearInfo(unittest.TestCase):
+
+    def test_year_info(self):
+        info = get_jyear_info(5777)
+        self.assertEqual(info.rosh_hashana, datetime(2016, 10, 3).toordinal())
+        self.assertEqual((info.days, info.leap, info.kviah), (353, False, CHASERIM))
+        info = get_jyear_info(5779)
+        self.assertEqual((info.days, info.leap, info.kviah), (385, True, SHELAIMIM))
+        self.assertEqual(info.month_starts[JewishDate.NISSAN], 385 - 177)
+
+    def test_abs_date(self):
+        self.assertEqual(jdate_to_abs_date(5777, 3, 24), datetime(2017, 6, 18).toordinal())
+        self.assertEqual(jdate_to_abs_date(5779, 13, 14), datetime(2019, 3, 21).toordinal())
+        self.assertEqual(get_days_in_jyear(5778), 354)
+
+    def test_abs_date_to_jdate(self):
+        self.assertEqual(abs_date_to_jdate(datetime(2017, 6, 18).toordinal()), (5777, 3, 24))
+        self.assertEqual(abs_date_to_jdate(1), (3761, 10, 18))
+        for year in (3762, 5779, 5780, 9999, 10000, 10001, 13000):
+            for month in range(1, 13 + get_jyear_info(year).leap):
+                for day in (1, get_jyear_info(year).month_lengths[month]):
+                    self.assertEqual(abs_date_to_jdate(jdate_to_abs_date(year, month, day)),
+                                     (year, month, day))
+
+    def test_packed_table(self):
+        import os
+        import tempfile
+        from jewishdate.JewishDate import (load_packed_table, _get_jcal_elapsed_days,
+                                           PACKED_FIRST_JYEAR, PACKED_LAST_JYEAR,
+                                           PACKED_TABLE_HEADER)
+        module = sys.modules['jewishdate.JewishDate']
+        table = module._packed_table
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'table', 'jyear_table.bin')
+
+        def replace_table(contents):
+            # the file is mapped, it is replaced instead of written over
+            with open(path + '.new', 'wb') as table_file:
+                table_file.write(contents)
+            os.replace(path + '.new', path)
+
+        try:
+            load_packed_table(path)
+            with open(path, 'rb') as table_file:
+                contents = table_file.read()
+            for year in (PACKED_FIRST_JYEAR, 5779, PACKED_LAST_JYEAR):
+                self.assertEqual(get_days_in_jyear(year),
+                                 _get_jcal_elapsed_days(year + 1) - _get_jcal_elapsed_days(year))
+                self.assertEqual(jdate_to_abs_date(year, TISHREI, 1),
+                                 _get_jcal_elapsed_days(year) + JewishDate.JEWISH_EPOCH + 1)
+            # a broken table, or one with a changed year, is generated again
+            index = PACKED_TABLE_HEADER.size + (5779 - PACKED_FIRST_JYEAR) * 4
+            for broken in (b'JYTB', contents[:index] + b'\0\0\0\0' + contents[index + 4:]):
+                replace_table(broken)
+                load_packed_table(path)
+                with open(path, 'rb') as table_file:
+                    self.assertEqual(table_file.read(), contents)
+                self.assertEqual(get_days_in_jyear(5779), 385)
+                self.assertEqual(jdate_to_abs_date(5779, TISHREI, 1),
+                                 _get_jcal_elapsed_days(5779) + JewishDate.JEWISH_EPOCH + 1)
+            load_packed_table() # in memory without $JEWISHDATE_TABLE
+            self.assertEqual(get_days_in_jyear(5779), 385)
+        finally:
+            module._packed_table = table
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+            os.rmdir(directory)
+
+class TestJewishDate(unittest.TestCase):
+
+    def test_lazy_fields(self):
+        jdate = JewishDate(datetime(2017, 6, 18, 10, 30))
+        self.assertEqual((jdate.dayofweek, jdate.weekday(), jdate.isoweekday()), (1, 6, 7))
+        self.assertEqual((jdate.jyear, jdate.jmonth, jdate.jday), (5777, 3, 24))
+        jdate = JewishDate(5777, 3, 24)
+        self.assertEqual(jdate.toordinal(), datetime(2017, 6, 18).toordinal())
+        self.assertEqual(jdate.dt, datetime(2017, 6, 18))
+
+    def test_lazy_import(self):
+        modules = subprocess.check_output(
+            [sys.executable, '-c', 'import jewishdate, sys; print(sorted(sys.modules))'],
+            universal_newlines=True)
+        self.assertNotIn('mmap', modules)
+        name = subprocess.check_output(
+            [sys.executable, '-c', 'import jewishdate.HebrewDateFormatter, jewishdate; '
+                                   'print(jewishdate.HebrewDateFormatter.__name__)'],
+            universal_newlines=True)
+        self.assertEqual(name.strip(), 'HebrewDateFormatter')
+
+    def test_import_time(self):
+        from benchmark import IMPORT_TIME_BUDGET, get_import_time
+        self.assertLessEqual(get_import_time(), IMPORT_TIME_BUDGET)
+
+    def test_forward_back(self):
+        jdate = JewishDate(datetime(2017, 9, 20, 8)) # Erev Rosh Hashana 5778
+        jdate.forward()
+        self.assertEqual(jdate.dt, datetime(2017, 9, 21, 8))
+        self.assertEqual((jdate.jyear, jdate.jmonth, jdate.jday), (5778, 7, 1))
+        jdate.back()
+        jdate.back()
+        self.assertEqual((jdate.jyear, jdate.jmonth, jdate.jday), (5777, 6, 28))
+        self.assertEqual(jdate.dt, datetime(2017, 9, 19, 8))
+
+    def test_range(self):
+        dates = list(JewishDate.range(datetime(2017, 9, 19), JewishDate(5778, 7, 2)))
+        self.assertEqual([(d.jyear, d.jmonth, d.jday) for d in dates],
+                         [(5777, 6, 28), (5777, 6, 29), (5778, 7, 1)])
+        dates = list(JewishCalendar.range(JewishDate(5778, 7, 2), datetime(2017, 9, 17), -2,
+                                          inisrael=True))
+        self.assertEqual([d.dt for d in dates], [datetime(2017, 9, 22), datetime(2017, 9, 20),
+                                                 datetime(2017, 9, 18)])
+        self.assertTrue(all(d.in_israel for d in dates))
+        cursor = list(JewishDate.range(datetime(2017, 9, 19), datetime(2017, 9, 22), cursor=True))
+        self.assertTrue(cursor[0] is cursor[-1])
+
+    def test_arithmetic(self):
+        calendar = JewishCalendar(datetime(2017, 6, 18, 10, 30), inisrael=True)
+        later = calendar + timedelta(days=400)
+        self.assertEqual(later.dt, datetime(2018, 7, 23, 10, 30))
+        self.assertEqual((later.jyear, later.jmonth, later.jday), (5778, 5, 11))
+        self.assertTrue(later.in_israel)
+        self.assertEqual(later - calendar, 400)
+        self.assertEqual((later - timedelta(days=400)).dt, calendar.dt)
+        self.assertEqual(FrozenJewishDate(5777, 3, 24) - JewishDate(5777, 3, 1), 23)
+
+    def test_add_months_years(self):
+        self.assertEqual(add_jmonths(5779, SHEVAT, 1), (5779, ADAR))
+        self.assertEqual(add_jmonths(5779, SHEVAT, 2), (5779, ADAR_II))
+        self.assertEqual(add_jmonths(5778, ELUL, 1), (5779, TISHREI))
+        self.assertEqual(add_jmonths(5780, NISSAN, -1), (5780, ADAR))
+        jdate = JewishDate(5779, ADAR, 30).add_years(1) # Adar I 30 on a regular year
+        self.assertEqual((jdate.jyear, jdate.jmonth, jdate.jday), (5780, ADAR, 29))
+        jdate = JewishDate(5778, ADAR, 14).add_years(1)
+        self.assertEqual((jdate.jyear, jdate.jmonth, jdate.jday), (5779, ADAR_II, 14))
+        jdate = JewishDate(5776, CHESHVAN, 30).add_months(13)
+        self.assertEqual((jdate.jyear, jdate.jmonth, jdate.jday), (5777, CHESHVAN, 29))
+
+
+    def test_molad(self):
+        self.assertEqual(get_molad(5771, ADAR_II), (datetime(2011, 3, 5).toordinal(), 0, 0, 7))
+        molad = JewishDate(5771, ADAR_II, 1).get_molad()
+        self.assertEqual(molad.dt, datetime(2011, 3, 5, 0, 0, 23))
+        self.assertEqual((molad.molad_hours, molad.molad_minutes, molad.molad_chalakim), (0, 0, 7))
+
+    def test_molados(self):
+        molados = get_jyear_molados(5771, 5772)
+        self.assertEqual(list(molados.months), [7, 8, 9, 10, 11, 12, 13, 1, 2, 3, 4, 5, 6])
+        self.assertEqual(molados.molads[1] - molados.molads[0], 765433)
+        index = molados.months.index(ADAR_II)
+        self.assertEqual((molados.days[index], molados.hours[index], molados.minutes[index],
+                          molados.chalakim[index]), get_molad(5771, ADAR_II))
+        self.assertEqual(list(get_molados(5771, ADAR_II, 2).months), [ADAR_II, NISSAN])
+
+class TestFrozenJewishDate(unittest.TestCase):
+
+    def test_value_semantics(self):
+        frozen = FrozenJewishDate(5777, 3, 24)
+        self.assertEqual(frozen, FrozenJewishDate(datetime(2017, 6, 18)))
+        self.assertEqual(frozen, JewishDate(5777, 3, 24).freeze())
+        self.assertEqual(len({frozen, FrozenJewishDate(datetime(2017, 6, 18))}), 1)
+        self.assertTrue(frozen < FrozenJewishDate(5777, 3, 25) <= FrozenJewishDate(5777, 4, 1))
+        self.assertEqual(frozen.jdate, (5777, 3, 24))
+        self.assertEqual(repr(frozen), "FrozenJewishDate(5777, 3, 24)")
+        with self.assertRaises(AttributeError):
+            frozen._ordinal = 1
+
+    def test_conversion(self):
+        frozen = FrozenJewishDate(5777, 3, 23)
+        calendar = frozen.to_jewish_calendar()
+        self.assertEqual(calendar.get_parsha_index(), 36)
+        self.assertEqual(FrozenJewishDate.from_jewish_date(calendar), frozen)
+        self.assertEqual(frozen.to_jewish_date().dt, datetime(2017, 6, 17))
+
+
+class TestJewishCalendar(unittest.TestCase):
+
+    def test_yom_tov_index(self):
+        calendar = JewishCalendar(datetime(2017, 9, 21)) # Rosh Hashana 5778
+        self.assertEqual(calendar.get_yom_tov_index(), JewishCalendar.ROSH_HASHANA)
+        calendar = JewishCalendar(datetime(2017, 9, 24)) # Tzom Gedalyah pushed off to Sunday
+        self.assertEqual(calendar.get_yom_tov_index(), JewishCalendar.FAST_OF_GEDALYAH)
+        calendar = JewishCalendar(5778, 1, 22)
+        self.assertEqual(calendar.get_yom_tov_index(), JewishCalendar.PESACH)
+        calendar = JewishCalendar(5778, 1, 22, inisrael=True)
+        self.assertEqual(calendar.get_yom_tov_index(), None)
+        self.assertEqual(JewishCalendar(5779, 12, 14).get_yom_tov_index(),
+                        JewishCalendar.PURIM_KATAN)
+
+    def test_parsha_index(self):
+        self.assertEqual(JewishCalendar(datetime(2017, 6, 17)).get_parsha_index(), 36)
+        self.assertEqual(JewishCalendar(datetime(2017, 6, 18)).get_parsha_index(), None)
+        # the 8th day of Pesach 5778 is on Shabbos, so Israel reads Shmini a week earlier
+        self.assertEqual(JewishCalendar(datetime(2018, 4, 7)).get_parsha_index(), None)
+        self.assertEqual(JewishCalendar(datetime(2018, 4, 7), inisrael=True).get_parsha_index(),
+                         25)
+
+    def test_upcoming_parsha_index(self):
+        calendar = JewishCalendar(datetime(2017, 6, 13))
+        self.assertEqual(calendar.get_upcoming_parsha_index(), 36)
+        calendar = JewishCalendar(datetime(2017, 10, 8)) # Succos, next Shabbos is Chol Hamoed
+        self.assertEqual(calendar.get_upcoming_parsha_index(), 0)
+        calendar = JewishCalendar(datetime(2017, 9, 17)) # Shabbos Rosh Hashana is next week
+        self.assertEqual(calendar.get_upcoming_parsha_index(), 52)
+
+    def test_parshiyos(self):
+        parshiyos = get_parshiyos(datetime(2017, 9, 18).toordinal(),
+                                  datetime(2017, 10, 15).toordinal())
+        self.assertEqual([(datetime.fromordinal(o).day, index) for o, index in parshiyos],
+                         [(23, 52), (30, None), (7, None), (14, 0)])
+
+    def test_templates_are_shared(self):
+        self.assertTrue(get_jyear_template(5778) is get_jyear_template(5778 + 247))
+        self.assertEqual(len(get_jyear_template(5779).holidays), 385)
+
+    def test_default_date(self):
+        before = datetime.now()
+        calendar = JewishCalendar()
+        self.assertTrue(before <= calendar.dt <= datetime.now())
+
+    def test_erev_pesach(self):
+        # the JewishCalendar methods have no holiday on Erev Pesach, kept for compatibility
+        calendar = JewishCalendar(datetime(2018, 3, 30))
+        self.assertEqual(calendar.get_yom_tov_index(), None)
+        self.assertFalse(calendar.is_erev_yom_tov())
+        start = datetime(2018, 3, 30).toordinal()
+        info = get_day_info(start, start + 2) # Erev Pesach and Pesach
+        self.assertEqual(list(info.yom_tov_index), [JewishCalendar.EREV_PESACH,
+                                                    JewishCalendar.PESACH])
+        self.assertEqual(list(info.is_erev_yom_tov), [1, 0])
+        self.assertEqual(list(info.is_yom_tov), [0, 1])
+
+    def test_day_info(self):
+        start = datetime(2017, 12, 10).toordinal()
+        stop = datetime(2018, 4, 10).toordinal()
+        info = get_day_info(start, stop)
+        for name in info._fields:
+            self.assertEqual(len(getattr(info, name)), stop - start)
+        for i, ordinal in enumerate(range(start, stop)):
+            calendar = JewishCalendar(datetime.fromordinal(ordinal))
+            self.assertEqual((info.jyears[i], info.jmonths[i], info.jdays[i]),
+                             (calendar.jyear, calendar.jmonth, calendar.jday))
+            self.assertEqual(info.dayofweek[i], calendar.dayofweek)
+            index = calendar.get_yom_tov_index()
+            if (calendar.jmonth, calendar.jday) != (NISSAN, 14): # see test_erev_pesach
+                self.assertEqual(info.yom_tov_index[i], -1 if index is None else index)
+                self.assertEqual(info.is_erev_yom_tov[i], calendar.is_erev_yom_tov())
+                self.assertEqual(info.is_yom_tov[i],
+                                 index is not None and not calendar.is_erev_yom_tov()
+                                 and index != JewishCalendar.CHANUKAH
+                                 and not (calendar.is_taanis()
+                                          and index != JewishCalendar.YOM_KIPPUR))
+            self.assertEqual(info.is_rosh_chodesh[i], calendar.is_rosh_chodesh())
+            self.assertEqual(info.day_of_chanukah[i], calendar.get_day_of_chanukah() or 0)
+            self.assertEqual(info.day_of_omer[i], calendar.get_day_of_omer() or 0)
+            parsha = calendar.get_parsha_index()
+            self.assertEqual(info.parsha_index[i], -1 if parsha is None else parsha)
+            self.assertEqual((info.daf_yomi_masechta[i], info.daf_yomi_daf[i]),
+                             calendar.get_daf_yomi_bavli())
+
+    def test_daf_yomi_bavli(self):
+        self.assertEqual(JewishCalendar(datetime(1923, 9, 10)).get_daf_yomi_bavli(), None)
+        self.assertEqual(JewishCalendar(datetime(1923, 9, 11)).get_daf_yomi_bavli(), (0, 2))
+        self.assertEqual(JewishCalendar(datetime(1975, 6, 23)).get_daf_yomi_bavli(), (39, 73))
+        self.assertEqual(JewishCalendar(datetime(2020, 1, 4)).get_daf_yomi_bavli(), (39, 73))
+        self.assertEqual(JewishCalendar(datetime(2020, 1, 5)).get_daf_yomi_bavli(), (0, 2))
+
+    def test_daf_yomi_bavli_range(self):
+        start = datetime(1923, 9, 1).toordinal()
+        stop = datetime(1980, 1, 1).toordinal()
+        self.assertEqual(list(get_daf_yomi_bavli_range(start, stop)),
+                         [JewishCalendar(datetime.fromordinal(o)).get_daf_yomi_bavli()
+                          for o in range(start, stop)])
+
+
+class TestAnniversaries(unittest.TestCase):
+
+    def test_yahrzeit(self):
+        self.assertEqual(get_yahrzeit(5778, NISSAN, 1, 5778), None)
+        self.assertEqual(get_yahrzeit(5778, NISSAN, 1, 5779), jdate_to_abs_date(5779, NISSAN, 1))
+        # Cheshvan 5777 is short, so the yahrzeit is on the last day of Cheshvan
+        self.assertEqual(get_yahrzeit(5776, CHESHVAN, 30, 5780),
+                         jdate_to_abs_date(5780, CHESHVAN, 30))
+        self.assertEqual(get_yahrzeit(5776, CHESHVAN, 30, 5781),
+                         jdate_to_abs_date(5781, CHESHVAN, 29))
+        # Cheshvan 5771 is long, so it is 30 Cheshvan or 1 Kislev when Cheshvan is short
+        self.assertEqual(get_yahrzeit(5770, CHESHVAN, 30, 5780),
+                         jdate_to_abs_date(5780, CHESHVAN, 30))
+        self.assertEqual(get_yahrzeit(5770, CHESHVAN, 30, 5781),
+                         jdate_to_abs_date(5781, KISLEV, 1))
+        self.assertEqual(get_yahrzeit(5779, ADAR_II, 7, 5780), jdate_to_abs_date(5780, ADAR, 7))
+        self.assertEqual(get_yahrzeit(5779, ADAR_II, 7, 5782), jdate_to_abs_date(5782, ADAR_II, 7))
+        self.assertEqual(get_yahrzeit(5779, ADAR, 30, 5780), jdate_to_abs_date(5780, SHEVAT, 30))
+        self.assertEqual(get_yahrzeit(5778, ADAR, 7, 5779), jdate_to_abs_date(5779, ADAR, 7))
+
+    def test_anniversary(self):
+        self.assertEqual(get_anniversary(5778, ADAR, 7, 5779), jdate_to_abs_date(5779, ADAR_II, 7))
+        self.assertEqual(get_anniversary(5779, ADAR_II, 7, 5780), jdate_to_abs_date(5780, ADAR, 7))
+        self.assertEqual(get_anniversary(5779, ADAR, 30, 5780), jdate_to_abs_date(5780, NISSAN, 1))
+        self.assertEqual(get_anniversary(5776, CHESHVAN, 30, 5778),
+                         jdate_to_abs_date(5778, KISLEV, 1))
+        self.assertEqual(get_anniversary(5776, KISLEV, 30, 5777),
+                         jdate_to_abs_date(5777, TEVES, 1))
+
+
+class TestRecurrence(unittest.TestCase):
+
+    def test_rosh_chodesh(self):
+        from jewishdate.recurrence import RoshChodeshRule
+        start = datetime(2017, 9, 1).toordinal()
+        stop = datetime(2018, 9, 1).toordinal()
+        self.assertEqual(list(RoshChodeshRule().between(start, stop)),
+                         [o for o in range(start, stop)
+                          if JewishCalendar(datetime.fromordinal(o)).is_rosh_chodesh()])
+
+    def test_annual(self):
+        from jewishdate.recurrence import AnnualRule
+        purim = AnnualRule(ADAR, 14, leap_jmonth=ADAR_II)
+        self.assertEqual(purim.next_after(datetime(2018, 2, 28).toordinal()),
+                         datetime(2018, 3, 1).toordinal())
+        self.assertEqual(purim.next_after(datetime(2018, 3, 1).toordinal()),
+                         datetime(2019, 3, 21).toordinal())
+        self.assertEqual(purim.previous_before(datetime(2019, 3, 21).toordinal()),
+                         datetime(2018, 3, 1).toordinal())
+        rule = AnnualRule(CHESHVAN, 30, fallback=(KISLEV, 1))
+        self.assertEqual(rule.get_occurrences(5776), (jdate_to_abs_date(5776, CHESHVAN, 30),))
+        self.assertEqual(rule.get_occurrences(5778), (jdate_to_abs_date(5778, KISLEV, 1),))
+        self.assertEqual(AnnualRule(CHESHVAN, 30).get_occurrences(5778), ())
+
+    def test_shabbos_mevarchim(self):
+        from jewishdate.recurrence import ShabbosMevarchimRule
+        # Shabbos 27 Tishrei 5778, Cheshvan is blessed
+        self.assertEqual(ShabbosMevarchimRule().next_after(datetime(2017, 10, 1).toordinal()),
+                         datetime(2017, 10, 14).toordinal())
+
+    def test_yom_tov(self):
+        from jewishdate.recurrence import YomTovRule
+        chanukah = list(YomTovRule(JewishCalendar.CHANUKAH).between(
+            datetime(2017, 9, 1).toordinal(), datetime(2018, 9, 1).toordinal()))
+        self.assertEqual(chanukah, list(range(datetime(2017, 12, 13).toordinal(),
+                                              datetime(2017, 12, 21).toordinal())))
+
+
+    def test_anniversary_index(self):
+        from jewishdate.recurrence import AnniversaryIndex
+        index = AnniversaryIndex()
+        index.add(5776, KISLEV, 30, "30 Kislev")
+        index.add(5770, TEVES, 1, "1 Teves")
+        index.add(5779, ADAR, 7, "7 Adar I")
+        index.add_date(datetime(2018, 2, 22), "7 Adar") # 5778 is a regular year
+        self.assertEqual(len(index), 4)
+        # Kislev 5777 is short, both fall on 1 Teves
+        self.assertEqual(sorted(index.events_on(jdate_to_abs_date(5777, TEVES, 1))),
+                         ["1 Teves", "30 Kislev"])
+        self.assertEqual(index.events_on(jdate_to_abs_date(5779, ADAR_II, 7)), ["7 Adar"])
+        self.assertEqual(index.events_on(jdate_to_abs_date(5779, ADAR, 7)), [])
+        self.assertEqual(sorted(index.events_on(jdate_to_abs_date(5781, ADAR, 7))),
+                         ["7 Adar", "7 Adar I"])
+        yahrzeits = AnniversaryIndex(yahrzeit=True)
+        yahrzeits.add(5776, CHESHVAN, 30, "30 Cheshvan")
+        self.assertEqual(yahrzeits.events_on(jdate_to_abs_date(5781, CHESHVAN, 29)),
+                         ["30 Cheshvan"])
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestVectorized(unittest.TestCase):
+
+    def test_round_trip(self):
+        from jewishdate.vectorized import ordinals_to_jdates, jdates_to_ordinals
+        ordinals = numpy.arange(1, datetime.max.toordinal() + 1, 37)
+        jyears, jmonths, jdays = ordinals_to_jdates(ordinals)
+        for i in range(0, len(ordinals), 501):
+            self.assertEqual((jyears[i], jmonths[i], jdays[i]),
+                             abs_date_to_jdate(int(ordinals[i])))
+        self.assertTrue((jdates_to_ordinals(jyears, jmonths, jdays) == ordinals).all())
+        self.assertEqual(jdates_to_ordinals(5777, 3, 24), datetime(2017, 6, 18).toordinal())
+
+    def test_anniversaries(self):
+        from jewishdate.vectorized import (jdates_to_yahrzeits, jdates_to_anniversaries,
+                                           ordinals_to_yahrzeits)
+        jdates = [(5776, CHESHVAN, 30), (5770, CHESHVAN, 30), (5779, ADAR_II, 7),
+                  (5779, ADAR, 30), (5778, ADAR, 7), (5790, NISSAN, 1)]
+        jyears, jmonths, jdays = [numpy.array(column) for column in zip(*jdates)]
+        for target in (5780, 5781, 5782):
+            self.assertEqual(list(jdates_to_yahrzeits(jyears, jmonths, jdays, target)),
+                             [get_yahrzeit(y, m, d, target) or 0 for y, m, d in jdates])
+            self.assertEqual(list(jdates_to_anniversaries(jyears, jmonths, jdays, target)),
+                             [get_anniversary(y, m, d, target) or 0 for y, m, d in jdates])
+        ordinals = [jdate_to_abs_date(*jdate) for jdate in jdates]
+        self.assertEqual(list(ordinals_to_yahrzeits(ordinals, 5800)),
+                         [get_yahrzeit(y, m, d, 5800) for y, m, d in jdates])
+
+    def test_out_of_range(self):
+        from jewishdate.vectorized import ordinals_to_jdates, jdates_to_ordinals
+        with self.assertRaises(ValueError):
+            ordinals_to_jdates([-400])
+        with self.assertRaises(ValueError):
+            jdates_to_ordinals([3000], [1], [1])
+
+
+@unittest.skipIf(pytz is None, "pytz is not installed")
+class TestKiddushLevana(unittest.TestCase):
+
+    def test_times(self):
+        from jewishdate.kiddush_levana import get_kiddush_levana_utc, get_kiddush_levana_times
+        from jewishdate.utils import GeoLocation
+        molados = get_molados(5771, ADAR_II, 2)
+        times = get_kiddush_levana_utc(molados)
+        self.assertEqual(len(times), 2)
+        # 0:00 and 7 chalakim Jerusalem mean time
+        self.assertEqual(times[0].molad, datetime(2011, 3, 4, 21, 39, 26, 837333, pytz.utc))
+        self.assertEqual(times[0].earliest_3_days - times[0].molad, timedelta(days=3))
+        self.assertEqual(times[0].earliest_7_days - times[0].molad, timedelta(days=7))
+        self.assertEqual(times[0].latest_15_days - times[0].molad, timedelta(days=15))
+        self.assertEqual(times[0].latest_between_molados,
+                         times[0].molad + (times[1].molad - times[0].molad) / 2)
+        lakewood = GeoLocation("Lakewood, NJ", 40.096, -74.222, 0,
+                               pytz.timezone("America/New_York"))
+        local = get_kiddush_levana_times(molados, [lakewood, lakewood])
+        self.assertTrue(local[0] is local[1])
+        self.assertEqual(local[0][0].molad.replace(tzinfo=None),
+                         datetime(2011, 3, 4, 16, 39, 26, 837333))
+        self.assertEqual(local[0][0].latest_15_days.replace(tzinfo=None),
+                         datetime(2011, 3, 19, 17, 39, 26, 837333)) # after the DST change
+
+
+class TestParser(unittest.TestCase):
+    def test_parse_jdate(self):
+        from jewishdate.parser import parse_jdate
+        for text in ("כ״ד סיון תשע״ז", 'כ"ד סיון ה\'תשע"ז', "כד בסיון תשעז", "24 Sivan, 5777",
+                     "24 sivan 5777", "כ״ד סיוון ה׳ תשע״ז"):
+            self.assertEqual(parse_jdate(text), (5777, 3, 24))
+        self.assertEqual(parse_jdate("כ״ב אדר ב׳ תשע״ו"), (5776, ADAR_II, 22))
+        self.assertEqual(parse_jdate("22 Adar II, 5776"), (5776, ADAR_II, 22))
+        self.assertEqual(parse_jdate("ל׳ אדר א׳ תשע״ו"), (5776, ADAR, 30))
+        for text in ("30 Adar II, 5776", "ל׳ אדר תשע״ז", "24 Sivan", "Sivan 24 5777", ""):
+            with self.assertRaises(ValueError):
+                parse_jdate(text)
+
+    def test_round_trip(self):
+        from jewishdate import HebrewDateFormatter
+        from jewishdate.parser import parse_jdate
+        formatters = [HebrewDateFormatter(hebrew, gersh, long_years) for hebrew in (False, True)
+                      for gersh in (False, True) for long_years in (False, True)]
+        for days in range(0, 3000, 7): # includes the leap years 5776 and 5779
+            jdate = JewishDate(datetime(2015, 9, 1) + timedelta(days=days))
+            for formatter in formatters:
+                self.assertEqual(parse_jdate(formatter.format_date(jdate)),
+                                 (jdate.jyear, jdate.jmonth, jdate.jday))
+
+    def test_parse_jdates(self):
+        from jewishdate.parser import parse_jdates
+        texts = ["24 Sivan, 5777", "כ״ד סיון תשע״ז", "not a date", "24 Sivan, 5777"]
+        self.assertEqual(parse_jdates(texts, skip_invalid=True),
+                         [(5777, 3, 24), (5777, 3, 24), None, (5777, 3, 24)])
+        with self.assertRaises(ValueError):
+            parse_jdates(texts)
+
+
+class TestFormatterThreads(unittest.TestCase):
+
+    def setUp(self):
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6) # switch threads as often as possible
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def test_stress(self):
+        import threading
+        from jewishdate import HebrewDateFormatter
+        jdates = [JewishDate(datetime(2017, 1, 1) + timedelta(days=i * 37)) for i in range(40)]
+        # a formatter whose settings another thread keeps changing renders every date with
+        # one of the configurations, never a mix of them
+        changing = HebrewDateFormatter(hebrew=True)
+        allowed = {}
+        for jdate in jdates:
+            allowed[jdate.toordinal()] = set(
+                HebrewDateFormatter(hebrew=True, use_gersh_gershayim=gersh,
+                                    use_long_hebrew_years=long_years).format_date(jdate)
+                for gersh in (True, False) for long_years in (True, False))
+        shared = HebrewDateFormatter.get_shared(hebrew=True)
+        expected = dict((jdate.toordinal(), shared.format(jdate, "#e #b #y %d/%m/%Y"))
+                        for jdate in jdates)
+        day_and_month = dict((jdate.toordinal(), shared.format(jdate, "#e #b "))
+                             for jdate in jdates)
+        errors = []
+        done = threading.Event()
+
+        def change():
+            while not done.is_set():
+                changing.use_gersh_gershayim = not changing.use_gersh_gershayim
+                changing.use_long_hebrew_years = not changing.use_long_hebrew_years
+
+        def render(thread):
+            for i in range(30):
+                for jdate in jdates:
+                    ordinal = jdate.toordinal()
+                    if changing.format_date(jdate) not in allowed[ordinal]:
+                        errors.append(changing.format_date(jdate))
+                    if shared.format(jdate, "#e #b #y %d/%m/%Y") != expected[ordinal]:
+                        errors.append(ordinal)
+                    # more format strings than the cache keeps, so programs are evicted
+                    text = "x%d" % (thread * 1000 + i * 40 + ordinal % 40)
+                    if shared.format(jdate, "#e #b " + text) != day_and_month[ordinal] + text:
+                        errors.append(text)
+
+        changer = threading.Thread(target=change)
+        changer.start()
+        renderers = [threading.Thread(target=render, args=(i,)) for i in range(4)]
+        for thread in renderers:
+            thread.start()
+        for thread in renderers:
+            thread.join()
+        done.set()
+        changer.join()
+        self.assertEqual(errors, [])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file